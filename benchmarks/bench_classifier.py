@@ -0,0 +1,86 @@
+"""categorize_article の旧実装と KeywordClassifier の比較ベンチマーク
+
+使い方: python benchmarks/bench_classifier.py [記事数]
+"""
+import os
+import sys
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from classifier import load_classifier
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def legacy_categorize(title: str, content: str) -> str:
+    """変更前の categorize_article（呼び出しごとに辞書を作り直し、順に部分一致を調べる）"""
+    title_lower = title.lower()
+    content_lower = content.lower()
+    text = f"{title_lower} {content_lower}"
+
+    categories = {
+        '刑事法': ['刑事', '逮捕', '起訴', '判決', '裁判', '犯罪', '容疑', '検察', '警察'],
+        '民事法': ['民事', '損害賠償', '契約', '不法行為', '債権', '債務', '相続', '離婚'],
+        '企業法': ['企業', '会社法', '株主', '取締役', 'コンプライアンス', 'M&A', '株式'],
+        '労働法': ['労働', '雇用', '解雇', '残業', 'ハラスメント', '労災', '賃金'],
+        '憲法': ['憲法', '人権', '表現の自由', '選挙', '政治', '国会', '内閣'],
+        '行政法': ['行政', '許可', '認可', '規制', '官庁', '公務員', '地方自治'],
+        '税法': ['税', '税務', '確定申告', '消費税', '所得税', '法人税'],
+        '知的財産法': ['特許', '商標', '著作権', '知的財産', 'IP', '発明'],
+        '国際法': ['国際', '外国', '条約', '貿易', '外交', '海外'],
+        '一般法律': []
+    }
+
+    for category, keywords in categories.items():
+        if category == '一般法律': continue
+        for keyword in keywords:
+            if keyword in text:
+                return category
+
+    return '一般法律'
+
+
+def synthetic_corpus(size: int, seed: int = 0):
+    """同梱の articles.json の文章を切り貼りして記事を合成する"""
+    with open(os.path.join(REPO_ROOT, 'articles.json'), 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+    sentences = [s for a in articles for s in a['content'].split('。') if s]
+    titles = [a['title'] for a in articles]
+    rng = random.Random(seed)
+    return [
+        (f"{rng.choice(titles)} #{i}", '。'.join(rng.choices(sentences, k=8)))
+        for i in range(size)
+    ]
+
+
+def measure(func, corpus):
+    start = time.perf_counter()
+    results = [func(title, content) for title, content in corpus]
+    return time.perf_counter() - start, results
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    corpus = synthetic_corpus(size)
+
+    legacy_time, legacy_results = measure(legacy_categorize, corpus)
+    classifier = load_classifier()
+    new_time, new_results = measure(classifier.classify, corpus)
+    # 同じ記事を再分類した場合（メモ化が効く2回目の呼び出し）
+    memo_time, _ = measure(classifier.classify, corpus)
+
+    mismatches = sum(1 for a, b in zip(legacy_results, new_results) if a != b)
+    print(f"記事数: {size}")
+    print(f"旧実装:           {legacy_time * 1000:8.1f} ms")
+    print(f"KeywordClassifier: {new_time * 1000:8.1f} ms (x{legacy_time / new_time:.1f})")
+    print(f"  メモ化済み再分類: {memo_time * 1000:8.1f} ms")
+    print(f"判定の不一致: {mismatches}件")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""記事ページ・一覧ページ解析の旧実装と現行実装の比較ベンチマーク
+
+benchmarks/fixtures/<site_key>/ のHTMLを繰り返し解析する。フィクスチャは実サイトの
+保存ページではなく、セレクタとページ構成（ヘッダー・関連記事・フッターなど）を
+実サイトに合わせて作った合成ページのため、所要時間は目安として扱う。
+旧実装の再現に beautifulsoup4 を使用する。
+使い方: python benchmarks/bench_parsing.py [繰り返し回数]
+"""
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from bs4 import BeautifulSoup
+
+from fetchers import FetchedPage
+from scraper import RobustScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def legacy_parse_article(scraper: RobustScraper, html: str, site_key: str):
+    """変更前の get_article_detail の解析部分（html.parser で全体を解析し不要要素を削除）"""
+    config = scraper.site_configs[site_key]
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for unwanted_selector in ['script', 'style', 'aside', 'footer', 'form', ".related", "header"]:
+        for element in soup.select(unwanted_selector):
+            element.decompose()
+
+    title_elem = soup.select_one(config['selectors']['title'])
+    title = scraper.clean_text(title_elem.get_text()) if title_elem else "タイトル不明"
+
+    content = "内容を取得できませんでした。"
+    content_elem = soup.select_one(config['selectors']['content'])
+    if content_elem:
+        text_parts = [scraper.clean_text(p.get_text()) for p in content_elem.find_all('p') if len(scraper.clean_text(p.get_text())) > 20]
+        if text_parts: content = ' '.join(text_parts)[:500] + '...'
+
+    published_date = None
+    date_elem = soup.select_one(config['selectors']['date'])
+    if date_elem:
+        dt_str = date_elem.get('datetime', scraper.clean_text(date_elem.get_text()))
+        try: published_date = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+        except ValueError:
+            match = re.search(r'(\d{4})[/\.年]\s*(\d{1,2})[/\.月]\s*(\d{1,2})', dt_str)
+            if match: published_date = datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    return title, content, published_date
+
+
+def legacy_listing_links(scraper: RobustScraper, html: str, site_key: str):
+    config = scraper.site_configs[site_key]
+    soup = BeautifulSoup(html, 'html.parser')
+    return [a.get('href') for a in soup.select(config['selectors']['links'])]
+
+
+def current_listing_links(scraper: RobustScraper, html: str, site_key: str):
+    config = scraper.site_configs[site_key]
+    page = FetchedPage(config['list_url'], html, 'http')
+    return [a.get('href') for a in page.select(config['selectors']['links'])]
+
+
+def measure(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def read_fixture(site_key: str, name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, site_key, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    scraper = RobustScraper()
+    failed = False
+    print(f"繰り返し: {repeat}回")
+    for site_key in scraper.site_configs:
+        article_html = read_fixture(site_key, 'article.html')
+        listing_html = read_fixture(site_key, 'listing.html')
+
+        legacy_time, legacy = measure(lambda: legacy_parse_article(scraper, article_html, site_key), repeat)
+        url = f"{scraper.site_configs[site_key]['list_url']}1"
+        current_time, current = measure(
+            lambda: scraper.parse_article(FetchedPage(url, article_html, 'http'), url, site_key), repeat)
+        same = (current['title'], current['content']) == legacy[:2]
+
+        legacy_list_time, legacy_links = measure(lambda: legacy_listing_links(scraper, listing_html, site_key), repeat)
+        current_list_time, current_links = measure(lambda: current_listing_links(scraper, listing_html, site_key), repeat)
+
+        print(f"[{site_key}]")
+        print(f"  記事ページ: 旧 {legacy_time * 1000:7.2f} ms / 現 {current_time * 1000:7.2f} ms (x{legacy_time / current_time:.1f}) 抽出結果一致: {same}")
+        print(f"  一覧ページ: 旧 {legacy_list_time * 1000:7.2f} ms / 現 {current_list_time * 1000:7.2f} ms (x{legacy_list_time / current_list_time:.1f}) リンク一致: {legacy_links == current_links}")
+        failed = failed or not same or legacy_links != current_links
+    scraper.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
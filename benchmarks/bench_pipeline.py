@@ -0,0 +1,229 @@
+"""ローカルサーバを相手にしたスクレイピング〜RSS生成の通しベンチマーク
+
+fixture_server.py が benchmarks/fixtures/ のHTMLをひな形に合成記事を配信し、
+RobustScraper と StaticRSSGenerator を実サイトと同じ流れで動かす。
+記事数ごと・段階ごとに処理件数/秒、1件あたりの所要時間 (p50/p95)、
+tracemalloc で計ったPythonヒープのピーク（段階開始時からの増分）を表示する。
+
+スクレイピングは本番と同じく1サイトあたり --scrape-limit 件まで（既定100件）とし、
+記事ストアとRSS生成には合成した全記事を使う。
+
+使い方:
+  python benchmarks/bench_pipeline.py [--sizes 100,10000,100000]
+  python benchmarks/bench_pipeline.py --save-baseline benchmarks/baseline.json
+  python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json [--tolerance 0.25]
+--baseline を指定すると、所要時間かピークメモリが基準値を許容幅以上に上回った段階があれば
+終了コード1で終わる。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+
+from fixture_server import SITES, build_corpus, serve
+from article_store import ArticleStore, iter_articles_json
+from http_cache import ResponseCache
+from instrumentation import stats
+from rss_generator import StaticRSSGenerator
+from scraper import RobustScraper
+
+# 小さすぎる段階の揺らぎで失敗しないよう、基準値からの超過がこの秒数未満なら許容する
+MIN_REGRESSION_SECONDS = 0.05
+
+# 1件あたりの所要時間として p50/p95 を示す span（instrumentation の記録名）
+LATENCY_SPANS = {
+    'scrape.links': 'listing_page',
+    'scrape.details': 'article_detail',
+    'scrape.details_revalidate': 'article_detail',
+    'generate.store': 'rss.write_feed',
+    'generate.json': 'rss.write_feed',
+}
+
+
+def start_server(size: int, seed: int):
+    """別プロセスでサーバを起動する（計測対象とGILを取り合わないようにする）"""
+    context = multiprocessing.get_context('spawn')
+    port_queue = context.Queue()
+    process = context.Process(target=serve, args=(size, seed, port_queue), daemon=True)
+    process.start()
+    return process, port_queue.get(timeout=120)
+
+
+def run_stage(results: Dict, name: str, func: Callable[[], int]):
+    """func を実行して所要時間とピークメモリを記録する。func は処理件数を返す"""
+    stats.drain()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    items = func()
+    elapsed = time.perf_counter() - start
+    # 段階の開始時点で確保済みのメモリ（合成した記事など）を除いた増分のピーク
+    peak = tracemalloc.get_traced_memory()[1] - before
+    result = {
+        'items': items,
+        'seconds': round(elapsed, 4),
+        'throughput': round(items / elapsed, 1) if elapsed > 0 else None,
+        'peak_mb': round(peak / 1024 / 1024, 2),
+    }
+    latency = stats.summary()['stages'].get(LATENCY_SPANS.get(name))
+    if latency:
+        result['p50_ms'] = round(latency['p50'] * 1000, 2)
+        result['p95_ms'] = round(latency['p95'] * 1000, 2)
+    results[name] = result
+    return result
+
+
+def corpus_articles(corpus: Dict[str, List[Dict]], base_urls: Dict[str, str], scraper: RobustScraper) -> List[Dict]:
+    """合成記事を scrape_new_articles の結果と同じ形の辞書にする"""
+    return [
+        {
+            'title': article['title'],
+            'url': f"{base_urls[site_key]}/news/{article['id']}",
+            'content': article['body'][:500] + '...',
+            'published_date': article['published_date'],
+            'source': scraper.site_configs[site_key]['name'],
+            'site_key': site_key,
+        }
+        for site_key, articles in corpus.items()
+        for article in articles
+    ]
+
+
+def bench_size(size: int, seed: int, scrape_limit: int, workdir: str) -> Dict:
+    results = {}
+    server, base_urls = start_server(size, seed)
+    corpus = build_corpus(size, seed)
+    scraper = RobustScraper(cache=ResponseCache(os.path.join(workdir, 'cache')))
+    for site_key, config in scraper.site_configs.items():
+        config['list_url'] = base_urls[site_key] + SITES[site_key]['list_path']
+        config['rate_limit'] = {'requests_per_second': 100000, 'max_in_flight': scraper.max_workers}
+    scraper.configure_rate_limits()
+    try:
+        links = []
+        def scrape_links():
+            links.extend(scraper.get_all_article_links(max_per_site=scrape_limit))
+            return len(links)
+        run_stage(results, 'scrape.links', scrape_links)
+        expected = sum(min(scrape_limit, len(articles)) for articles in corpus.values())
+        if len(links) != expected:
+            raise RuntimeError(f"リンク数が想定と異なります: {len(links)} (想定 {expected})")
+
+        scraped = []
+        def scrape_details():
+            scraped[:] = [article for article in scraper.get_article_details(links) if article]
+            return len(links)
+        run_stage(results, 'scrape.details', scrape_details)
+        if len(scraped) != len(links):
+            raise RuntimeError(f"記事詳細の取得に失敗しました: {len(scraped)}/{len(links)}件")
+        # 2回目は条件付きGET (304) と抽出結果のキャッシュを通る
+        run_stage(results, 'scrape.details_revalidate', scrape_details)
+    finally:
+        scraper.close()
+        server.terminate()
+
+    generator = StaticRSSGenerator()
+    articles = corpus_articles(corpus, base_urls, scraper)
+    with ArticleStore(os.path.join(workdir, 'articles.db'), generator.classifier) as store:
+        def upsert():
+            store.upsert_articles(articles + scraped)
+            return store.count()
+        def generate():
+            generator.generate(store=store, metadata_path='metadata.json')
+            return store.count()
+        run_stage(results, 'store.upsert', upsert)
+        run_stage(results, 'generate.store', generate)
+        # 記事が変わっていない2回目は指紋の比較だけで終わる
+        run_stage(results, 'generate.unchanged', generate)
+
+    # articles.json を読み込んで生成する経路（記事ストアが無い場合の rss_generator.main と同じ）
+    with open('articles.json', 'w', encoding='utf-8') as f:
+        json.dump(articles, f, ensure_ascii=False, default=lambda value: value.isoformat())
+    del articles
+    def generate_from_json():
+        generator.generate(articles=iter_articles_json('articles.json'), metadata_path='metadata_json.json')
+        return size
+    run_stage(results, 'generate.json', generate_from_json)
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """基準値より遅い・メモリを多く使う段階を列挙する"""
+    regressions = []
+    for size, stages in results.items():
+        for name, result in stages.items():
+            base = baseline.get(size, {}).get(name)
+            if not base:
+                continue
+            limit = max(base['seconds'] * (1 + tolerance), base['seconds'] + MIN_REGRESSION_SECONDS)
+            if result['seconds'] > limit:
+                regressions.append(f"{size}件 {name}: {result['seconds']:.3f}秒 (基準 {base['seconds']:.3f}秒)")
+            if result['peak_mb'] > max(base['peak_mb'] * (1 + tolerance), base['peak_mb'] + 1):
+                regressions.append(f"{size}件 {name}: ピーク {result['peak_mb']:.1f}MB (基準 {base['peak_mb']:.1f}MB)")
+    return regressions
+
+
+def print_results(size: int, stages: Dict):
+    print(f"[記事数 {size}]")
+    print(f"  {'段階':<26}{'件数':>8}{'秒':>9}{'件/秒':>10}{'p50 ms':>9}{'p95 ms':>9}{'ピークMB':>10}")
+    for name, r in stages.items():
+        print(f"  {name:<26}{r['items']:>8}{r['seconds']:>9.3f}{r['throughput'] or 0:>10.1f}"
+              f"{r.get('p50_ms', ''):>9}{r.get('p95_ms', ''):>9}{r['peak_mb']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,10000,100000', help="合成する記事数（カンマ区切り）")
+    parser.add_argument('--scrape-limit', type=int, default=100, help="1サイトあたりにスクレイピングする記事数")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help="比較する基準値のJSON")
+    parser.add_argument('--save-baseline', help="今回の結果を基準値として保存するパス")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="基準値からの許容割合")
+    args = parser.parse_args()
+
+    # 記事ごとのログは計測の妨げになるため警告以上のみ表示する
+    logging.getLogger().setLevel(logging.WARNING)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    save_path = os.path.abspath(args.save_baseline) if args.save_baseline else None
+
+    results = {}
+    original_dir = os.getcwd()
+    tracemalloc.start()
+    for size in (int(value) for value in args.sizes.split(',')):
+        # フィードなどは作業ディレクトリからの相対パスに書き出されるため、一時ディレクトリで実行する
+        workdir = tempfile.mkdtemp(prefix=f'bench-{size}-')
+        os.chdir(workdir)
+        try:
+            results[str(size)] = bench_size(size, args.seed, args.scrape_limit, workdir)
+        finally:
+            os.chdir(original_dir)
+            shutil.rmtree(workdir, ignore_errors=True)
+        print_results(size, results[str(size)])
+    tracemalloc.stop()
+
+    if save_path:
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"基準値を保存しました: {save_path}")
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("基準値を超えた段階:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("基準値との比較: 問題なし")
+
+
+if __name__ == "__main__":
+    main()
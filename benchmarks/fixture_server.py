@@ -0,0 +1,220 @@
+"""ベンチマーク用のローカルHTTPサーバ
+
+benchmarks/fixtures/<site_key>/ の合成HTML（実サイトの構造を模したもの）をひな形にして、合成した記事を
+corporate_legal・ben54 と同じURL構成・ページ送りで配信する。
+サイトごとに別のポートで待ち受けるため、スクレイパー側ではホストも別になる。
+"""
+import os
+import re
+import json
+import random
+import hashlib
+import threading
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+REPO_ROOT = os.path.join(BENCH_DIR, '..')
+
+JST = timezone(timedelta(hours=9))
+NEWEST = datetime(2026, 10, 15, 18, 0, tzinfo=JST)
+
+# 実サイトに合わせたURL構成とページ送り
+SITES = {
+    'corporate_legal': {
+        'list_path': '/news/',
+        'page_path': '/news/page/{page}/',
+        'listing_re': re.compile(r'^/news/(?:page/(\d+)/)?$'),
+        'links': 'div.l-main div.container a[href*="/news/"]',
+        'next': 'a.next.page-numbers',
+        'title': 'h1.title-articles',
+        'date': 'h1.title-articles .text-s',
+        'content': 'div.l-cont1',
+    },
+    'ben54': {
+        'list_path': '/news/list',
+        'page_path': '/news/list?page={page}',
+        'listing_re': re.compile(r'^/news/list(?:\?page=(\d+))?$'),
+        'links': 'ul.c-list li.p-news-list a',
+        'next': 'li.p-btn__next a',
+        'title': 'h1.p-ttl__lv1',
+        'date': 'time[datetime]',
+        'content': 'div.p-news__contents',
+    },
+}
+ARTICLE_RE = re.compile(r'^/news/(\d+)$')
+
+
+def build_corpus(size: int, seed: int = 0) -> Dict[str, List[Dict]]:
+    """同梱の articles.json の文章を切り貼りし、サイトごとに新しい順の記事を合成する"""
+    with open(os.path.join(REPO_ROOT, 'articles.json'), 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+    sentences = [s for a in articles for s in a['content'].split('。') if len(s) > 10]
+    titles = [a['title'] for a in articles]
+    rng = random.Random(seed)
+    corpus = {}
+    for site_index, site_key in enumerate(SITES):
+        count = size // len(SITES) + (1 if site_index < size % len(SITES) else 0)
+        corpus[site_key] = [
+            {
+                'id': count - k,
+                'title': f"{rng.choice(titles)} #{site_key}-{count - k}",
+                'body': '。'.join(rng.choices(sentences, k=6)) + '。',
+                'published_date': NEWEST - timedelta(minutes=30 * k),
+            }
+            for k in range(count)
+        ]
+    return corpus
+
+
+def _read_fixture(site_key: str, name: str):
+    with open(os.path.join(FIXTURES_DIR, site_key, name), 'r', encoding='utf-8') as f:
+        return lxml.html.document_fromstring(f.read())
+
+
+def _serialize(tree) -> str:
+    return '<!DOCTYPE html>\n' + lxml.html.tostring(tree, encoding='unicode')
+
+
+class SiteTemplates:
+    """フィクスチャから一覧・記事ページのひな形文字列を作り、記事を差し込んで返す"""
+
+    def __init__(self, site_key: str, articles: List[Dict]):
+        self.site = SITES[site_key]
+        self.articles = articles
+        self.by_id = {article['id']: article for article in articles}
+        self._build_listing(site_key)
+        self._build_article(site_key)
+
+    def _build_listing(self, site_key: str):
+        tree = _read_fixture(site_key, 'listing.html')
+        items = [link.getparent() for link in CSSSelector(self.site['links'])(tree) if re.search(r'/news/\d+$', link.get('href'))]
+        self.per_page = len(items)
+        prototype = deepcopy(items[0])
+        link = prototype.find('.//a')
+        link.set('href', '__URL__')
+        title_elem = link[-1]
+        title_elem.text = '__TITLE__'
+        date_elem = link[0]
+        date_elem.text = '__DATE__'
+        if date_elem.get('datetime') is not None:
+            date_elem.set('datetime', '__DATETIME__')
+        self.item_template = lxml.html.tostring(prototype, encoding='unicode').strip()
+
+        container = items[0].getparent()
+        marker = lxml.html.fragment_fromstring('<i>__ITEMS__</i>')
+        container.insert(container.index(items[0]), marker)
+        for item in items:
+            item.drop_tree()
+        CSSSelector(self.site['next'])(tree)[0].set('href', '__NEXT__')
+        self.listing_template = _serialize(tree).replace('<i>__ITEMS__</i>', '__ITEMS__')
+        # 最後のページには「次へ」が無い
+        CSSSelector(self.site['next'])(tree)[0].drop_tree()
+        self.last_listing_template = _serialize(tree).replace('<i>__ITEMS__</i>', '__ITEMS__')
+
+    def _build_article(self, site_key: str):
+        tree = _read_fixture(site_key, 'article.html')
+        date_elem = CSSSelector(self.site['date'])(tree)[0]
+        date_elem.text = '__DATE__'
+        if date_elem.get('datetime') is not None:
+            date_elem.set('datetime', '__DATETIME__')
+        title_elem = CSSSelector(self.site['title'])(tree)[0]
+        title_elem.text = '__TITLE__ ' if date_elem in title_elem else '__TITLE__'
+        content = CSSSelector(self.site['content'])(tree)[0]
+        paragraph = next(p for p in content.iterdescendants('p') if len(p.text_content().strip()) > 20)
+        for child in list(paragraph):
+            paragraph.remove(child)
+        paragraph.text = '__BODY__'
+        self.article_template = _serialize(tree)
+
+    def listing(self, page: int) -> str:
+        start = (page - 1) * self.per_page
+        if page < 1 or (start >= len(self.articles) and page > 1):
+            return None
+        chunk = self.articles[start:start + self.per_page]
+        items = '\n'.join(
+            self.item_template
+            .replace('__URL__', f"/news/{article['id']}")
+            .replace('__TITLE__', escape(article['title']))
+            .replace('__DATETIME__', article['published_date'].strftime('%Y-%m-%d'))
+            .replace('__DATE__', article['published_date'].strftime('%Y.%m.%d'))
+            for article in chunk
+        )
+        if start + self.per_page < len(self.articles):
+            html = self.listing_template.replace('__NEXT__', self.site['page_path'].format(page=page + 1))
+        else:
+            html = self.last_listing_template
+        return html.replace('__ITEMS__', items)
+
+    def article(self, article_id: int) -> str:
+        article = self.by_id.get(article_id)
+        if article is None:
+            return None
+        published = article['published_date']
+        return (self.article_template
+                .replace('__TITLE__', escape(article['title']))
+                .replace('__BODY__', escape(article['body']))
+                .replace('__DATETIME__', published.isoformat())
+                .replace('__DATE__', f"{published.year}年{published.month}月{published.day}日"))
+
+
+def make_handler(templates: SiteTemplates):
+    class Handler(BaseHTTPRequestHandler):
+        # keep-alive を有効にし、実サイトと同じく接続を使い回せるようにする
+        protocol_version = 'HTTP/1.1'
+        # ヘッダと本文を別々に送るため、Nagle と遅延ACKで1リクエストごとに数十ms待たされるのを防ぐ
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            listing = templates.site['listing_re'].match(self.path)
+            article = ARTICLE_RE.match(self.path)
+            if listing:
+                body = templates.listing(int(listing.group(1) or 1))
+            elif article:
+                body = templates.article(int(article.group(1)))
+            else:
+                body = None
+            if body is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            data = body.encode('utf-8')
+            etag = '"' + hashlib.md5(data).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def serve(size: int, seed: int, port_queue):
+    """サイトごとにサーバを起動し、{site_key: ベースURL} を port_queue に送って待ち続ける"""
+    corpus = build_corpus(size, seed)
+    base_urls = {}
+    for site_key, articles in corpus.items():
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(SiteTemplates(site_key, articles)))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_urls[site_key] = f"http://127.0.0.1:{server.server_port}"
+    port_queue.put(base_urls)
+    threading.Event().wait()
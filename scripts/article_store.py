@@ -0,0 +1,292 @@
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from classifier import KeywordClassifier, load_classifier
+from publisher import atomic_write
+
+logger = logging.getLogger(__name__)
+
+JST = timezone(timedelta(hours=9))
+
+STORE_PATH = 'data/articles.db'
+
+# site_key を持たない過去の記事データ向けに、サイト名から site_key を引く
+SOURCE_KEYS = {
+    '企業法務ナビ': 'corporate_legal',
+    '弁護士JPニュース': 'ben54',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    guid TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    published_date TEXT NOT NULL,
+    published_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    site_key TEXT,
+    category TEXT NOT NULL,
+    duplicate_of TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_articles_guid ON articles (guid);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_at DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source, published_at DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_site_key ON articles (site_key, published_at DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_category ON articles (category, published_at DESC);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+COLUMNS = ('url', 'guid', 'title', 'content', 'published_date', 'published_at', 'source', 'site_key', 'category', 'duplicate_of')
+
+
+# articles.json を少しずつ読み込むときの1回あたりの読み込み量（文字数）
+JSON_READ_CHUNK = 64 * 1024
+
+
+def iter_articles_json(filepath: str) -> Iterator[Dict]:
+    """articles.json を先頭から1件ずつ読み込む
+
+    JSON配列はファイル全体を読まずに要素ごとに取り出し、JSON Lines（1行1記事）にも対応する。
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        buffer = ''
+        while not buffer:
+            chunk = f.read(JSON_READ_CHUNK)
+            if not chunk:
+                return
+            buffer = chunk.lstrip()
+        if not buffer.startswith('['):
+            # JSON Lines
+            for line in _lines(buffer, f):
+                if line.strip():
+                    yield json.loads(line)
+            return
+        pos, eof = 1, False
+        while True:
+            while True:
+                # 要素間の空白・カンマを読み飛ばす
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                buffer, pos = f.read(JSON_READ_CHUNK), 0
+                eof = not buffer
+            if pos >= len(buffer):
+                raise ValueError(f"JSON配列が閉じられていません: {filepath}")
+            if buffer[pos] == ']':
+                return
+            try:
+                article, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 要素が読み込み済みの範囲の外まで続いているので、続きを読み足してやり直す
+                chunk = f.read(JSON_READ_CHUNK)
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield article
+            pos = end
+
+
+def _lines(head: str, f) -> Iterator[str]:
+    """先に読み込んだ先頭部分と残りのファイルを行単位で返す"""
+    rest = head + f.readline()
+    yield from rest.splitlines(keepends=True)
+    yield from f
+
+
+def article_guid(article: Dict) -> str:
+    """記事の guid。未設定ならタイトルのハッシュ"""
+    return article.get('guid') or hashlib.sha1(article['title'].encode('utf-8')).hexdigest()
+
+
+def _to_datetime(value) -> datetime:
+    published = datetime.fromisoformat(value) if isinstance(value, str) else value
+    return published if published.tzinfo else published.replace(tzinfo=JST)
+
+
+class ArticleStore:
+    """記事のアーカイブを保持するSQLiteストア
+
+    URLを主キーに記事を upsert し、サイト・カテゴリ・公開日時の索引から
+    フィードごとの最新N件を必要な分だけ取り出す。
+    """
+
+    def __init__(self, path: str = STORE_PATH, classifier: Optional[KeywordClassifier] = None):
+        self.path = path
+        self.classifier = classifier or load_classifier()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._reclassify_if_rules_changed()
+
+    def _migrate(self):
+        """以前の版で作られたストアに不足している列を追加する"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(articles)")}
+        if 'duplicate_of' not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE articles ADD COLUMN duplicate_of TEXT")
+
+    def _reclassify_if_rules_changed(self):
+        """カテゴリの判定規則が前回と変わっていれば、アーカイブの全記事を分類し直す
+
+        category 列は登録時に一度だけ計算するため、規則を変えたときにここで揃えないと
+        カテゴリ別フィードの振り分けと記事の内容が食い違う。
+        """
+        row = self.conn.execute("SELECT value FROM store_meta WHERE key = 'category_rules'").fetchone()
+        if row and row[0] == self.classifier.rules_hash:
+            return
+        updates = []
+        for url, title, content, stored in self.conn.execute("SELECT url, title, content, category FROM articles"):
+            category = self.classifier.classify(title, content)
+            if category != stored:
+                updates.append((category, url))
+        with self.conn:
+            self.conn.executemany("UPDATE articles SET category = ? WHERE url = ?", updates)
+            self.conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('category_rules', ?)",
+                              (self.classifier.rules_hash,))
+        if updates:
+            logger.info(f"カテゴリの判定規則が変わったため、{len(updates)}件の記事を分類し直しました")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _row_values(self, article: Dict) -> Tuple:
+        published = _to_datetime(article['published_date'])
+        source = article['source']
+        return (
+            article['url'],
+            # guid はタイトルのハッシュ。一度登録した記事はタイトルが変わっても guid を変えない
+            article_guid(article),
+            article['title'],
+            article['content'],
+            published.isoformat(),
+            published.timestamp(),
+            source,
+            article.get('site_key') or SOURCE_KEYS.get(source),
+            self.classifier.classify(article['title'], article['content']),
+            article.get('duplicate_of'),
+        )
+
+    def upsert_articles(self, articles: Iterable[Dict]) -> int:
+        """記事を登録・更新し、実際に変更された件数を返す（内容が同じ記事は書き換えない）
+
+        guid と duplicate_of は登録時の値を保つ。重複の印は dedup の索引が管理する。
+        """
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(f"""
+                INSERT INTO articles ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})
+                ON CONFLICT (url) DO UPDATE SET
+                    title = excluded.title,
+                    content = excluded.content,
+                    published_date = excluded.published_date,
+                    published_at = excluded.published_at,
+                    source = excluded.source,
+                    site_key = excluded.site_key,
+                    category = excluded.category
+                WHERE (title, content, published_date, source, site_key, category)
+                    IS NOT (excluded.title, excluded.content, excluded.published_date,
+                            excluded.source, excluded.site_key, excluded.category)
+            """, (self._row_values(article) for article in articles))
+        return self.conn.total_changes - before
+
+    def import_json(self, filepath: str) -> int:
+        """既存の articles.json をストアに取り込む（初回移行用）"""
+        if not os.path.exists(filepath):
+            return 0
+        changed = self.upsert_articles(iter_articles_json(filepath))
+        logger.info(f"{filepath} から {changed}件の記事をストアに取り込みました")
+        return changed
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def known_urls(self) -> Set[str]:
+        return {row[0] for row in self.conn.execute("SELECT url FROM articles")}
+
+    def guid_for(self, url: str) -> Optional[str]:
+        row = self.conn.execute("SELECT guid FROM articles WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def iter_newest(self, limit: Optional[int] = None, site_key: Optional[str] = None,
+                    category: Optional[str] = None, since: Optional[datetime] = None) -> Iterator[Dict]:
+        """公開日時の新しい順に記事を返す。条件はすべて索引で絞り込む
+
+        他の記事の重複と判定された記事は含めない。
+        """
+        where, params = ["duplicate_of IS NULL"], []
+        if site_key is not None:
+            where.append("site_key = ?")
+            params.append(site_key)
+        if category is not None:
+            where.append("category = ?")
+            params.append(category)
+        if since is not None:
+            where.append("published_at >= ?")
+            params.append(since.timestamp())
+        query = "SELECT * FROM articles WHERE " + " AND ".join(where)
+        query += " ORDER BY published_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        for row in self.conn.execute(query, params):
+            yield {
+                'title': row['title'],
+                'url': row['url'],
+                'content': row['content'],
+                'published_date': row['published_date'],
+                'source': row['source'],
+                'site_key': row['site_key'],
+                'guid': row['guid'],
+                'category': row['category'],
+            }
+
+    def newest(self, limit: Optional[int] = None, **filters) -> List[Dict]:
+        return list(self.iter_newest(limit, **filters))
+
+    def site_keys(self) -> List[Tuple[str, str]]:
+        """(site_key, サイト名) の一覧"""
+        rows = self.conn.execute(
+            "SELECT site_key, MAX(source) FROM articles WHERE site_key IS NOT NULL AND duplicate_of IS NULL"
+            " GROUP BY site_key ORDER BY site_key")
+        return [(row[0], row[1]) for row in rows]
+
+    def categories(self) -> List[str]:
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT category FROM articles WHERE duplicate_of IS NULL ORDER BY category")]
+
+    def export_json(self, filepath: str, limit: Optional[int] = None, since: Optional[datetime] = None) -> bool:
+        """互換用に最新の記事を articles.json として書き出す。内容が変わらなければ書き換えない"""
+        articles = [
+            {key: article[key] for key in ('title', 'url', 'content', 'published_date', 'source', 'site_key')}
+            for article in self.iter_newest(limit, since=since)
+        ]
+        data = json.dumps(articles, ensure_ascii=False, indent=2)
+        if os.path.exists(filepath):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                if f.read() == data:
+                    logger.info(f"記事データに変更はありません: {filepath}")
+                    return False
+        atomic_write(filepath, data)
+        logger.info(f"記事データを保存しました: {filepath} ({len(articles)}件)")
+        return True
@@ -0,0 +1,80 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# カテゴリ定義ファイル。先に書かれたカテゴリほど優先される
+CATEGORY_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'categories.json')
+
+# 判定結果を覚えておく記事数の上限。超えたら古いものから忘れる
+MEMO_MAX_ENTRIES = 10000
+
+
+class KeywordClassifier:
+    """全キーワードを1本の正規表現にまとめたカテゴリ分類器
+
+    選択肢はカテゴリの優先順に並べてあり、同じ位置で複数一致しても優先度の高いものが返る。
+    一致のたびに次の文字から探索し直すため、重なり合うキーワードも取りこぼさない。
+    最終的には一致したカテゴリのうち、定義順で最も先のものを採用する。
+    """
+
+    def __init__(self, categories: List[Tuple[str, List[str]]], default: str, slugs: Optional[Dict[str, str]] = None):
+        self.default = default
+        self.categories = [name for name, _ in categories]
+        # カテゴリ名 → カテゴリ別フィードのファイル名 (rss/category/<slug>.xml)
+        self.slugs = slugs or {}
+        # 判定規則の指紋。変わったら保存済みの記事を分類し直す
+        rules = json.dumps([categories, default], ensure_ascii=False)
+        self.rules_hash = hashlib.sha1(rules.encode('utf-8')).hexdigest()
+        self._priority: Dict[str, int] = {}
+        for priority, (_, keywords) in enumerate(categories):
+            for keyword in keywords:
+                self._priority.setdefault(keyword, priority)
+        ordered = sorted(self._priority, key=lambda keyword: (self._priority[keyword], -len(keyword)))
+        self._pattern = re.compile('|'.join(map(re.escape, ordered))) if ordered else None
+        self._memo: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def _match(self, text: str) -> str:
+        if self._pattern is None:
+            return self.default
+        best = None
+        match = self._pattern.search(text)
+        while match:
+            priority = self._priority[match.group()]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+            match = self._pattern.search(text, match.start() + 1)
+        return self.default if best is None else self.categories[best]
+
+    def slug(self, category: str) -> Optional[str]:
+        """カテゴリ別フィードのファイル名。定義に無いカテゴリは None"""
+        return self.slugs.get(category)
+
+    def classify(self, title: str, content: str) -> str:
+        """記事のカテゴリを返す。同じタイトル・本文の記事は1回だけ判定する"""
+        # 文字列のハッシュ値はオブジェクトにキャッシュされるため、組をそのままキーにする
+        key = (title, content)
+        category = self._memo.get(key)
+        if category is None:
+            category = self._match(f"{title.lower()} {content.lower()}")
+            with self._lock:
+                if len(self._memo) >= MEMO_MAX_ENTRIES:
+                    # 記事本文への参照を持ち続けないよう、最も古い判定結果を捨てる
+                    self._memo.pop(next(iter(self._memo)), None)
+                self._memo[key] = category
+        return category
+
+
+def load_classifier(filepath: Optional[str] = None) -> KeywordClassifier:
+    with open(filepath or CATEGORY_CONFIG_PATH, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    categories = [(entry['name'], entry['keywords']) for entry in config['categories']]
+    # どのカテゴリにもフィードを作るため、slug は省略できない
+    slugs = {entry['name']: entry['slug'] for entry in config['categories']}
+    slugs[config['default']] = config['default_slug']
+    return KeywordClassifier(categories, config['default'], slugs)
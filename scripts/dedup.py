@@ -0,0 +1,185 @@
+import re
+import hashlib
+import logging
+import unicodedata
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from article_store import ArticleStore, article_guid
+
+logger = logging.getLogger(__name__)
+
+# 文字 n-gram の長さ（日本語は単語区切りがないため文字単位で切る）
+SHINGLE_SIZE = 3
+
+# MinHash の次元数と LSH の分割（BANDS × ROWS = NUM_HASHES）
+NUM_HASHES = 64
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+
+# 推定 Jaccard 係数がこの値以上なら同じ記事とみなす
+DUPLICATE_THRESHOLD = 0.6
+
+_BIN_BITS = (NUM_HASHES - 1).bit_length()
+_VALUE_MASK = (1 << (64 - _BIN_BITS)) - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash (
+    url TEXT PRIMARY KEY,
+    signature BLOB NOT NULL,
+    canonical_url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS minhash_bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_minhash_bands ON minhash_bands (band, bucket);
+"""
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def shingles(title: str, content: str) -> set:
+    """表記ゆれ・空白・記号を除いたタイトルと本文から文字 n-gram の集合を作る"""
+    text = unicodedata.normalize('NFKC', f"{title} {content}").lower()
+    text = re.sub(r'[\W_]+', '', text)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(title: str, content: str) -> Optional[array]:
+    """1回のハッシュで作る MinHash 署名（one permutation hashing）
+
+    n-gram ごとに64bitのハッシュを1回だけ計算し、上位ビットで NUM_HASHES 個の区画に
+    振り分けて区画ごとの最小値を取る。空の区画は次の区画の値で埋める。
+    """
+    signature = [None] * NUM_HASHES
+    for shingle in shingles(title, content):
+        value = _hash64(shingle.encode('utf-8'))
+        bin_index, value = value >> (64 - _BIN_BITS), value & _VALUE_MASK
+        if signature[bin_index] is None or value < signature[bin_index]:
+            signature[bin_index] = value
+    filled = [i for i, value in enumerate(signature) if value is not None]
+    if not filled:
+        return None
+    for i in range(NUM_HASHES):
+        if signature[i] is None:
+            donor = next((j for j in filled if j > i), filled[0])
+            signature[i] = signature[donor]
+    return array('Q', signature)
+
+
+def similarity(a: array, b: array) -> float:
+    """一致する成分の割合（Jaccard 係数の推定値）"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_HASHES
+
+
+def band_buckets(signature: array) -> List[Tuple[int, int]]:
+    """LSH のバンドごとのバケット番号。いずれかのバケットが一致した記事だけを比較する"""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        # SQLite の INTEGER に収めるため符号付き64bitにする
+        bucket = int.from_bytes(hashlib.blake2b(rows.tobytes(), digest_size=8).digest(), 'big', signed=True)
+        buckets.append((band, bucket))
+    return buckets
+
+
+class DuplicateIndex:
+    """記事ストアの SQLite に保存する MinHash/LSH の索引
+
+    記事ごとに署名とバンドのバケットを保存し、新しい記事はバケットが一致した
+    既存記事とだけ署名を比較する。重複と判定した記事は、クラスタの正規記事
+    （最初に登録された記事）の URL を canonical_url に持つ。
+    """
+
+    def __init__(self, store: ArticleStore, threshold: float = DUPLICATE_THRESHOLD):
+        self.store = store
+        self.conn = store.conn
+        self.threshold = threshold
+        self.conn.executescript(SCHEMA)
+
+    def lookup(self, url: str) -> Optional[str]:
+        row = self.conn.execute("SELECT canonical_url FROM minhash WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def find_canonical(self, signature: array) -> Optional[str]:
+        """閾値以上に似た既存記事のうち最も似たものの正規記事の URL"""
+        candidates = set()
+        for band, bucket in band_buckets(signature):
+            candidates.update(row[0] for row in self.conn.execute(
+                "SELECT url FROM minhash_bands WHERE band = ? AND bucket = ?", (band, bucket)))
+        best, best_score = None, self.threshold
+        for url in sorted(candidates):
+            row = self.conn.execute("SELECT signature, canonical_url FROM minhash WHERE url = ?", (url,)).fetchone()
+            score = similarity(signature, array('Q', row[0]))
+            if score >= best_score:
+                best, best_score = row[1], score
+        return best
+
+    def add(self, url: str, signature: array, canonical_url: str):
+        self.conn.execute("INSERT OR REPLACE INTO minhash (url, signature, canonical_url) VALUES (?, ?, ?)",
+                          (url, signature.tobytes(), canonical_url))
+        self.conn.executemany("INSERT INTO minhash_bands (band, bucket, url) VALUES (?, ?, ?)",
+                              [(band, bucket, url) for band, bucket in band_buckets(signature)])
+
+    def assign(self, url: str, title: str, content: str) -> str:
+        """記事を索引に登録し、所属するクラスタの正規記事の URL を返す"""
+        canonical = self.lookup(url)
+        if canonical is not None:
+            return canonical
+        signature = minhash(title, content)
+        if signature is None:
+            return url
+        canonical = self.find_canonical(signature) or url
+        self.add(url, signature, canonical)
+        return canonical
+
+    def backfill(self) -> int:
+        """索引に未登録のアーカイブ記事を公開順に登録し、重複していた記事に印を付ける"""
+        rows = self.conn.execute("""
+            SELECT url, title, content FROM articles
+            WHERE url NOT IN (SELECT url FROM minhash)
+            ORDER BY published_at, url
+        """).fetchall()
+        if not rows:
+            return 0
+        duplicates = 0
+        with self.conn:
+            for url, title, content in rows:
+                canonical = self.assign(url, title, content)
+                if canonical != url:
+                    self.conn.execute("UPDATE articles SET duplicate_of = ? WHERE url = ?", (canonical, url))
+                    duplicates += 1
+        logger.info(f"重複判定の索引にアーカイブ {len(rows)}件を登録しました (重複 {duplicates}件)")
+        return len(rows)
+
+
+def deduplicate(store: ArticleStore, articles: List[Dict]) -> List[Dict]:
+    """新着記事をアーカイブおよび同じ回の記事と照合し、重複には印を付けて返す
+
+    重複した記事には duplicate_of（正規記事の URL）と正規記事の guid を設定する。
+    記事ストアには保存されるが、フィードと articles.json には正規記事だけが載る。
+    """
+    index = DuplicateIndex(store)
+    index.backfill()
+    guids: Dict[str, str] = {}
+    duplicates = 0
+    with store.conn:
+        # 同じ回に取得した記事どうしでは、先に公開された記事を正規記事とする
+        for article in sorted(articles, key=lambda a: (a['published_date'], a['url'])):
+            canonical = index.assign(article['url'], article['title'], article['content'])
+            if canonical == article['url']:
+                article['duplicate_of'] = None
+                guids[article['url']] = article_guid(article)
+                continue
+            article['duplicate_of'] = canonical
+            article['guid'] = guids.get(canonical) or store.guid_for(canonical) or article_guid(article)
+            duplicates += 1
+            logger.info(f"  重複記事: {article['url']} -> {canonical}")
+    logger.info(f"重複判定: {len(articles)}件中 {duplicates}件を既存記事の重複と判定しました")
+    return articles
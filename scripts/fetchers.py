@@ -0,0 +1,314 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+import lxml.html
+from lxml.cssselect import CSSSelector
+from requests.adapters import HTTPAdapter
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
+
+from http_cache import ResponseCache
+from instrumentation import stats
+
+logger = logging.getLogger(__name__)
+
+_selectors: Dict[str, CSSSelector] = {}
+
+def css(selector: str) -> CSSSelector:
+    """CSSセレクタをXPathに変換したものを使い回す"""
+    compiled = _selectors.get(selector)
+    if compiled is None:
+        compiled = _selectors[selector] = CSSSelector(selector, translator='html')
+    return compiled
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+
+def setup_driver():
+    options = Options()
+    options.page_load_strategy = 'eager'
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument(f"user-agent={USER_AGENT}")
+    prefs = {"profile.managed_default_content_settings.images": 2}
+    options.add_experimental_option("prefs", prefs)
+    chrome_binary_location = os.environ.get('CHROME_BINARY_LOCATION')
+    if chrome_binary_location:
+        options.binary_location = chrome_binary_location
+        logger.info(f"Chrome binary location set to: {chrome_binary_location}")
+    service = ChromeService(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': "Object.defineProperty(navigator, 'webdriver', { get: () => undefined })"})
+    return driver
+
+
+def wait_until(driver, condition: Callable, timeout: float, description: str):
+    """条件が満たされるまで待ち、要した時間をログに残す（タイムアウト時は TimeoutException）"""
+    start = time.perf_counter()
+    try:
+        with stats.span('wait'):
+            result = WebDriverWait(driver, timeout).until(condition)
+    except TimeoutException:
+        logger.warning(f"  待機タイムアウト: {description} ({time.perf_counter() - start:.2f}秒)")
+        raise
+    logger.info(f"  待機完了: {description} ({time.perf_counter() - start:.2f}秒)")
+    return result
+
+
+class HostRateLimiter:
+    """ホストごとのリクエスト間隔と同時接続数を制御する"""
+
+    def __init__(self, requests_per_second: float = 1.0, max_in_flight: int = 2):
+        self.default_budget = {'requests_per_second': requests_per_second, 'max_in_flight': max_in_flight}
+        self._lock = threading.Lock()
+        self._budgets: Dict[str, Dict] = {}
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+
+    def configure(self, url: str, requests_per_second: Optional[float] = None, max_in_flight: Optional[int] = None):
+        host = urlparse(url).netloc
+        budget = dict(self.default_budget)
+        if requests_per_second is not None:
+            budget['requests_per_second'] = requests_per_second
+        if max_in_flight is not None:
+            budget['max_in_flight'] = max_in_flight
+        with self._lock:
+            self._budgets[host] = budget
+            self._semaphores[host] = threading.Semaphore(budget['max_in_flight'])
+
+    def _reserve(self, host: str) -> float:
+        with self._lock:
+            budget = self._budgets.setdefault(host, dict(self.default_budget))
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / budget['requests_per_second']
+            return slot - now
+
+    def _semaphore(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                budget = self._budgets.setdefault(host, dict(self.default_budget))
+                self._semaphores[host] = threading.Semaphore(budget['max_in_flight'])
+            return self._semaphores[host]
+
+    @contextmanager
+    def limit(self, url: str):
+        host = urlparse(url).netloc
+        semaphore = self._semaphore(host)
+        # 同時接続数の空きと、リクエスト間隔の待ちをまとめて rate_limit として記録する
+        with stats.span('rate_limit'):
+            semaphore.acquire()
+            try:
+                delay = self._reserve(host)
+                if delay > 0:
+                    time.sleep(delay)
+            except BaseException:
+                semaphore.release()
+                raise
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+class FetchedPage:
+    """取得したページのHTMLと最終URL。lxmlの解析木は初回参照時に作る"""
+
+    def __init__(self, url: str, html: str, backend: str, from_cache: bool = False, body_hash: Optional[str] = None):
+        self.url = url
+        self.html = html
+        self.backend = backend
+        self.from_cache = from_cache
+        self.body_hash = body_hash
+        # ブラウザで取得した場合、そのページを表示しているドライバの枠
+        self.browser_slot: Optional[int] = None
+        self._tree = None
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            try:
+                self._tree = lxml.html.document_fromstring(self.html)
+            except ValueError:
+                # XML宣言付きの文字列はそのままでは解析できないためバイト列で渡す
+                self._tree = lxml.html.document_fromstring(self.html.encode('utf-8'))
+        return self._tree
+
+    def select(self, selector: str) -> List:
+        return css(selector)(self.tree)
+
+    def select_one(self, selector: str):
+        matches = self.select(selector)
+        return matches[0] if matches else None
+
+
+def _is_retryable(error: requests.RequestException) -> bool:
+    """接続エラー・タイムアウトと、5xx・429 の応答だけを再試行する（404 などは何度取っても同じ）"""
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status is not None and (status == 429 or status >= 500)
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class HttpFetcher:
+    """keep-alive のセッションを使い回す素のHTTP取得。cache があれば条件付きGETを行う"""
+
+    backend = 'http'
+
+    def __init__(self, timeout: int = 15, max_retries: int = 2, pool_size: int = 10, cache: Optional[ResponseCache] = None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'ja,en;q=0.8',
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, url: str) -> Optional[FetchedPage]:
+        entry = self.cache.lookup(url) if self.cache else None
+        headers = self.cache.conditional_headers(entry) if entry else {}
+        for attempt in range(self.max_retries + 1):
+            try:
+                with stats.span('network'):
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                stats.count('http.requests')
+                stats.count('http.bytes', len(response.content))
+                if response.status_code == 304 and entry:
+                    stats.count('http.not_modified')
+                    body = self.cache.load_body(entry)
+                    if body is not None:
+                        self.cache.refresh(url, entry)
+                        return FetchedPage(entry['final_url'], body, self.backend, from_cache=True, body_hash=entry['body_hash'])
+                    # 本文が失われていれば条件なしで取り直す
+                    entry, headers = None, {}
+                    continue
+                response.raise_for_status()
+                # 文字コードの指定がないページはHTML側の宣言から推定する
+                if 'charset' not in response.headers.get('Content-Type', '').lower():
+                    response.encoding = response.apparent_encoding
+                body_hash = None
+                if self.cache:
+                    body_hash = self.cache.store(url, response.url, response.text,
+                                                 response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                stats.count('pages.http')
+                return FetchedPage(response.url, response.text, self.backend, body_hash=body_hash)
+            except requests.RequestException as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    logger.warning(f"HTTP取得に失敗しました ({url}): {e}")
+                    stats.count('http.failures')
+                    return None
+                stats.count('http.retries')
+                time.sleep(2 ** attempt)
+        return None
+
+    def close(self):
+        self.session.close()
+
+
+class BrowserSlot:
+    """ドライバ1つ分の枠。ドライバは初回利用時に起動する"""
+
+    def __init__(self, index: int, driver=None):
+        self.index = index
+        self.driver = driver
+        self.lock = threading.Lock()
+
+
+class BrowserFetcher:
+    """ヘッドレスChromeによる取得。最大 max_drivers 個のドライバを必要になった分だけ起動する"""
+
+    backend = 'browser'
+
+    def __init__(self, driver=None, timeout: int = 20, max_drivers: int = 1):
+        self.timeout = timeout
+        self._slots = [BrowserSlot(i) for i in range(max(1, max_drivers))]
+        self._slots[0].driver = driver
+        self._available = threading.Condition()
+
+    @property
+    def started(self) -> bool:
+        return any(slot.driver is not None for slot in self._slots)
+
+    def _start(self, slot: BrowserSlot):
+        if slot.driver is None:
+            logger.info(f"ヘッドレスChromeを起動します (枠 {slot.index + 1}/{len(self._slots)})")
+            with stats.span('setup_driver', root=True):
+                slot.driver = setup_driver()
+
+    @contextmanager
+    def acquire(self, slot_index: Optional[int] = None):
+        """ドライバの枠を1つ借りる。slot_index を指定するとその枠が空くまで待つ"""
+        with self._available:
+            if slot_index is not None:
+                slot = self._slots[slot_index]
+                self._available.wait_for(lambda: slot.lock.acquire(blocking=False))
+            else:
+                # 起動済みのドライバを優先して使い、足りないときだけ新しく起動する
+                ordered = sorted(self._slots, key=lambda s: s.driver is None)
+                def take():
+                    for candidate in ordered:
+                        if candidate.lock.acquire(blocking=False):
+                            return candidate
+                    return None
+                slot = self._available.wait_for(take)
+        try:
+            self._start(slot)
+            yield slot
+        finally:
+            slot.lock.release()
+            with self._available:
+                self._available.notify_all()
+
+    def fetch(self, url: str, wait_selectors: Optional[List[str]] = None, timeout: Optional[float] = None) -> Optional[FetchedPage]:
+        """ページを開き、wait_selectors の要素がすべて現れた時点で内容を返す"""
+        with self.acquire() as slot:
+            return self._fetch(slot, url, wait_selectors or [], timeout or self.timeout)
+
+    def _fetch(self, slot: BrowserSlot, url: str, wait_selectors: List[str], timeout: float) -> Optional[FetchedPage]:
+        try:
+            with stats.span('network'):
+                slot.driver.get(url)
+            for selector in wait_selectors:
+                wait_until(slot.driver, EC.presence_of_element_located((By.CSS_SELECTOR, selector)), timeout, selector)
+            return self.current_page(slot)
+        except TimeoutException:
+            logger.warning(f"要素の読み込みがタイムアウトしました ({url})")
+            return self.current_page(slot)
+        except Exception as e:
+            logger.warning(f"ブラウザでの取得に失敗しました ({url}): {e}")
+            stats.count('browser.failures')
+            return None
+
+    def current_page(self, slot: BrowserSlot) -> FetchedPage:
+        page = FetchedPage(slot.driver.current_url, slot.driver.page_source, self.backend)
+        page.browser_slot = slot.index
+        stats.count('pages.browser')
+        stats.count('browser.bytes', len(page.html.encode('utf-8')))
+        return page
+
+    def close(self):
+        for slot in self._slots:
+            if slot.driver is not None:
+                slot.driver.quit()
+                slot.driver = None
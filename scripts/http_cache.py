@@ -0,0 +1,157 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from publisher import atomic_write
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get('SCRAPER_CACHE_DIR', '.cache/http')
+
+
+def _sha1(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """URLをキーにしたHTTPレスポンスのディスクキャッシュ
+
+    cache_dir/
+      entries/<sha1(url)>.json   ETag・Last-Modified・本文ハッシュ
+      bodies/<本文ハッシュ>.html   レスポンス本文
+      parsed/<site_key>-<本文ハッシュ>.json   本文から抽出済みの記事データ
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_age_days: int = 30, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, 'entries', f"{_sha1(url)}.json")
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.cache_dir, 'bodies', f"{body_hash}.html")
+
+    def _parsed_path(self, body_hash: str, site_key: str) -> str:
+        return os.path.join(self.cache_dir, 'parsed', f"{site_key}-{body_hash}.json")
+
+    def _read_json(self, filepath: str) -> Optional[Dict]:
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        entry = self._read_json(self._entry_path(url))
+        if not entry or not os.path.exists(self._body_path(entry['body_hash'])):
+            return None
+        return entry
+
+    def conditional_headers(self, entry: Dict) -> Dict[str, str]:
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load_body(self, entry: Dict) -> Optional[str]:
+        try:
+            with open(self._body_path(entry['body_hash']), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url: str, final_url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> str:
+        body_hash = _sha1(body)
+        body_path = self._body_path(body_hash)
+        if not os.path.exists(body_path):
+            atomic_write(body_path, body)
+        self._write_entry(url, {
+            'url': url,
+            'final_url': final_url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': body_hash,
+            'fetched_at': time.time(),
+        })
+        return body_hash
+
+    def refresh(self, url: str, entry: Dict):
+        """304で再検証できたエントリの取得時刻を更新する"""
+        self._write_entry(url, dict(entry, fetched_at=time.time()))
+
+    def _write_entry(self, url: str, entry: Dict):
+        atomic_write(self._entry_path(url), json.dumps(entry, ensure_ascii=False))
+
+    def invalidate(self, url: str):
+        try:
+            os.remove(self._entry_path(url))
+        except OSError:
+            pass
+
+    def load_parsed(self, body_hash: str, site_key: str) -> Optional[Dict]:
+        return self._read_json(self._parsed_path(body_hash, site_key))
+
+    def store_parsed(self, body_hash: str, site_key: str, record: Dict):
+        atomic_write(self._parsed_path(body_hash, site_key), json.dumps(record, ensure_ascii=False))
+
+    def _remove_body(self, body_hash: str):
+        paths = [self._body_path(body_hash)]
+        paths += glob.glob(os.path.join(self.cache_dir, 'parsed', f"*-{body_hash}.json"))
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def prune(self):
+        """期限切れのエントリを削除し、合計サイズが上限を超えていれば古い順に削除する"""
+        entries_dir = os.path.join(self.cache_dir, 'entries')
+        if not os.path.isdir(entries_dir):
+            return
+        now = time.time()
+        entries = []
+        for name in os.listdir(entries_dir):
+            path = os.path.join(entries_dir, name)
+            entry = self._read_json(path)
+            if not entry or now - entry.get('fetched_at', 0) > self.max_age_seconds:
+                os.remove(path)
+                continue
+            entries.append((entry['fetched_at'], path, entry['body_hash']))
+
+        # 参照されなくなった本文・抽出結果を削除し、残りのサイズを集計する
+        live_hashes = {body_hash for _, _, body_hash in entries}
+        sizes = {}
+        for sub_dir in ('bodies', 'parsed'):
+            directory = os.path.join(self.cache_dir, sub_dir)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                body_hash = os.path.splitext(name)[0].rsplit('-', 1)[-1]
+                if body_hash not in live_hashes:
+                    os.remove(path)
+                    continue
+                sizes[body_hash] = sizes.get(body_hash, 0) + os.path.getsize(path)
+
+        total = sum(sizes.values())
+        removed = 0
+        entries.sort()
+        refcount = {}
+        for _, _, body_hash in entries:
+            refcount[body_hash] = refcount.get(body_hash, 0) + 1
+        for _, path, body_hash in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            removed += 1
+            refcount[body_hash] -= 1
+            if refcount[body_hash] == 0:
+                self._remove_body(body_hash)
+                total -= sizes.get(body_hash, 0)
+        logger.info(f"HTTPキャッシュを整理しました: {len(entries) - removed}件 ({total / 1024 / 1024:.1f}MB)")
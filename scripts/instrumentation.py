@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import cProfile
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 実行ごとの計測結果の出力先
+RUN_STATS_PATH = os.environ.get('RUN_STATS_PATH', 'run_stats.json')
+
+# 指定するとそのパスに cProfile の結果を書き出す（ワーカープロセスは末尾にプロセスIDを付ける）
+PROFILE_PATH = os.environ.get('RUN_PROFILE')
+
+
+def _percentile(sorted_values: List[float], ratio: float) -> float:
+    """線形補間による百分位数"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * ratio
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class RunStats:
+    """処理段階ごとの所要時間とカウンタを集計する
+
+    span() は入れ子にすると名前を '.' でつなぐ（例: article_detail.network）。
+    入れ子の状態はスレッドごとに持つため、並行取得中のスレッドからも使える。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.spans: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+
+    def _stack(self) -> List[str]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, root: bool = False):
+        """囲んだ処理の所要時間を記録する。root=True なら外側の span の名前を付けない"""
+        stack = self._stack()
+        full_name = name if root or not stack else f"{stack[-1]}.{name}"
+        stack.append(full_name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stack.pop()
+            self.record(full_name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.spans.setdefault(name, []).append(seconds)
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def drain(self) -> Dict:
+        """これまでの計測値を取り出して空にする（ワーカープロセスから親へ送る用）"""
+        with self._lock:
+            snapshot = {'spans': self.spans, 'counters': self.counters}
+            self.spans, self.counters = {}, {}
+        return snapshot
+
+    def merge(self, snapshot: Optional[Dict]):
+        if not snapshot:
+            return
+        with self._lock:
+            for name, durations in snapshot['spans'].items():
+                self.spans.setdefault(name, []).extend(durations)
+            for name, value in snapshot['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> Dict:
+        with self._lock:
+            spans = {name: sorted(durations) for name, durations in self.spans.items()}
+            counters = dict(self.counters)
+        return {
+            'stages': {
+                name: {
+                    'count': len(durations),
+                    'total': round(sum(durations), 4),
+                    'p50': round(_percentile(durations, 0.5), 4),
+                    'p95': round(_percentile(durations, 0.95), 4),
+                    'max': round(durations[-1], 4),
+                }
+                for name, durations in sorted(spans.items())
+            },
+            'counters': dict(sorted(counters.items())),
+        }
+
+    def write(self, filepath: str = RUN_STATS_PATH, **extra):
+        """集計結果を JSON で書き出す（秒単位）"""
+        report = {**extra, **self.summary()}
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"計測結果を保存しました: {filepath}")
+
+
+# プロセス全体で共有する計測器
+stats = RunStats()
+
+
+@contextmanager
+def profiled(suffix: str = ''):
+    """RUN_PROFILE が設定されていれば、囲んだ処理を cProfile で計測して書き出す"""
+    if not PROFILE_PATH:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        filepath = PROFILE_PATH + suffix
+        profiler.dump_stats(filepath)
+        logger.info(f"プロファイルを保存しました: {filepath}")
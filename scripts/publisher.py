@@ -0,0 +1,59 @@
+import os
+import gzip
+import logging
+import tempfile
+import threading
+from typing import Union
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+_brotli_warned = threading.Event()
+
+# mkstemp は 0600 で作るため、通常のファイルと同じ権限にそろえるのに使う。
+# os.umask は読むだけでも書き換えが伴うため、スレッドから書き出す前の読み込み時に一度だけ取得する
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write(filepath: str, data: Union[str, bytes]):
+    """一時ファイルに書いてからリネームし、読み手が書きかけのファイルを見ないようにする
+
+    文字列は UTF-8 で書き出す。フィード・記事データ・HTTPキャッシュで共通に使う。
+    """
+    directory = os.path.dirname(filepath) or '.'
+    os.makedirs(directory, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def publish_file(filepath: str, data: bytes):
+    """ファイル本体と、事前圧縮した .gz・.br を並べて書き出す
+
+    .br は brotli パッケージがある場合のみ作り、無い場合は古い .br を残さないよう削除する。
+    gzip は更新時刻を埋め込まないため、内容が同じなら同じバイト列になる。
+    """
+    atomic_write(filepath, data)
+    atomic_write(f"{filepath}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        atomic_write(f"{filepath}.br", brotli.compress(data, mode=brotli.MODE_TEXT, quality=11))
+        return
+    if not _brotli_warned.is_set():
+        _brotli_warned.set()
+        logger.warning("brotli がインストールされていないため、.br ファイルの作成を省略します")
+    if os.path.exists(f"{filepath}.br"):
+        os.remove(f"{filepath}.br")
@@ -2,15 +2,79 @@ import json
 import os
 from datetime import datetime, timezone, timedelta
 from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom import minidom
+import io
 import logging
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterable, Optional, TextIO
 import hashlib # guid生成のために追加
+import heapq
+import glob
+
+from classifier import load_classifier
+from article_store import ArticleStore, SOURCE_KEYS, STORE_PATH, iter_articles_json
+from instrumentation import stats
+from publisher import publish_file
 
 # ログ設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+COMBINED_FEED_PATH = 'rss/combined.xml'
+
+# 1フィードあたりの最大記事数（記事ストアから新しい順に取り出す）
+FEED_MAX_ITEMS = int(os.environ.get('RSS_FEED_MAX_ITEMS', '200'))
+
+# 1フィードあたりの最大バイト数。超える分の古い記事は載せない（0なら制限なし）
+FEED_MAX_BYTES = int(os.environ.get('RSS_FEED_MAX_BYTES', '0'))
+
+# RSS_COMPACT=1 のときはインデント・改行なしで書き出し、配信サイズを減らす
+COMPACT_OUTPUT = os.environ.get('RSS_COMPACT') == '1'
+
+def _published_datetime(article: Dict) -> datetime:
+    """published_date を datetime で返す（文字列・タイムゾーンなしの値にも対応）"""
+    published = article['published_date']
+    if isinstance(published, str):
+        published = datetime.fromisoformat(published)
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone(timedelta(hours=+9)))
+    return published
+
+def _escape(data: str) -> str:
+    """minidom.toprettyxml と同じ規則で文字列をエスケープする"""
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
+
+class RSSStreamWriter:
+    """ElementTreeの要素を minidom.toprettyxml と同じ書式で出力先へ逐次書き出す"""
+
+    def __init__(self, out: TextIO, indent: str = "  ", newl: str = "\n"):
+        self.out = out
+        self.indent = indent
+        self.newl = newl
+
+    def _open_tag(self, tag: str, attrib: Dict) -> str:
+        attrs = ''.join(f' {name}="{_escape(value)}"' for name, value in attrib.items())
+        return f"<{tag}{attrs}"
+
+    def write_declaration(self):
+        self.out.write(f'<?xml version="1.0" encoding="utf-8"?>{self.newl}')
+
+    def start(self, tag: str, attrib: Dict, depth: int):
+        self.out.write(f"{self.indent * depth}{self._open_tag(tag, attrib)}>{self.newl}")
+
+    def end(self, tag: str, depth: int):
+        self.out.write(f"{self.indent * depth}</{tag}>{self.newl}")
+
+    def write_element(self, elem: Element, depth: int):
+        if len(elem):
+            self.start(elem.tag, elem.attrib, depth)
+            for child in elem:
+                self.write_element(child, depth + 1)
+            self.end(elem.tag, depth)
+        elif elem.text:
+            self.out.write(f"{self.indent * depth}{self._open_tag(elem.tag, elem.attrib)}>{_escape(elem.text)}</{elem.tag}>{self.newl}")
+        else:
+            self.out.write(f"{self.indent * depth}{self._open_tag(elem.tag, elem.attrib)}/>{self.newl}")
+
 class StaticRSSGenerator:
     """GitHub Pages用の静的RSS生成器"""
     
@@ -22,37 +86,19 @@ class StaticRSSGenerator:
             'language': 'ja',
             'generator': 'Static Legal RSS Tool'
         }
+        self.classifier = load_classifier()
+        self.compact = COMPACT_OUTPUT
+        self.max_bytes = FEED_MAX_BYTES or None
     
     def categorize_article(self, title: str, content: str) -> str:
-        # (この関数は変更なし)
-        title_lower = title.lower()
-        content_lower = content.lower()
-        text = f"{title_lower} {content_lower}"
-        
-        categories = {
-            '刑事法': ['刑事', '逮捕', '起訴', '判決', '裁判', '犯罪', '容疑', '検察', '警察'],
-            '民事法': ['民事', '損害賠償', '契約', '不法行為', '債権', '債務', '相続', '離婚'],
-            '企業法': ['企業', '会社法', '株主', '取締役', 'コンプライアンス', 'M&A', '株式'],
-            '労働法': ['労働', '雇用', '解雇', '残業', 'ハラスメント', '労災', '賃金'],
-            '憲法': ['憲法', '人権', '表現の自由', '選挙', '政治', '国会', '内閣'],
-            '行政法': ['行政', '許可', '認可', '規制', '官庁', '公務員', '地方自治'],
-            '税法': ['税', '税務', '確定申告', '消費税', '所得税', '法人税'],
-            '知的財産法': ['特許', '商標', '著作権', '知的財産', 'IP', '発明'],
-            '国際法': ['国際', '外国', '条約', '貿易', '外交', '海外'],
-            '一般法律': []
-        }
-        
-        for category, keywords in categories.items():
-            if category == '一般法律': continue
-            for keyword in keywords:
-                if keyword in text:
-                    return category
-        
-        return '一般法律'
+        """config/categories.json の定義でカテゴリを判定する（結果は記事ごとにキャッシュ）"""
+        return self.classifier.classify(title, content)
     
-    # ▼ ここからが変更箇所 ▼
-    def create_rss_item(self, article: Dict) -> Element:
-        """RSS itemエレメントを作成（元記事URLを削除）"""
+    def create_rss_item(self, article: Dict, published: Optional[datetime] = None, category: Optional[str] = None) -> Element:
+        """RSS itemエレメントを作成（元記事URLを削除）
+
+        published・category を計算済みであれば渡すことで、日付の解析と分類を省略できる。
+        """
         item = Element('item')
         SubElement(item, 'title').text = article['title']
         
@@ -63,87 +109,317 @@ class StaticRSSGenerator:
         description.text = article['content']
         
         pub_date = SubElement(item, 'pubDate')
-        if isinstance(article['published_date'], str):
-            pub_datetime = datetime.fromisoformat(article['published_date'])
-        else:
-            pub_datetime = article['published_date']
-        if pub_datetime.tzinfo is None:
-            jst = timezone(timedelta(hours=+9))
-            pub_datetime = pub_datetime.replace(tzinfo=jst)
+        pub_datetime = published or _published_datetime(article)
         pub_date.text = pub_datetime.strftime('%a, %d %b %Y %H:%M:%S %z')
         
         # guid（ユニークID）も元記事URLを含まないように、タイトルからハッシュを生成して設定
         # これによりRSSリーダーが記事の重複を正しく判定できる
-        guid_text = hashlib.sha1(article['title'].encode('utf-8')).hexdigest()
+        # 記事ストアから読み込んだ記事は、初回登録時に決めた guid をそのまま使う
+        guid_text = article.get('guid') or hashlib.sha1(article['title'].encode('utf-8')).hexdigest()
         guid = SubElement(item, 'guid', isPermaLink='false')
         guid.text = guid_text
 
-        category = SubElement(item, 'category')
-        category.text = self.categorize_article(article['title'], article['content'])
+        SubElement(item, 'category').text = category or self.categorize_article(article['title'], article['content'])
         
         # sourceタグは前回同様、生成しない
         
         return item
-    # ▲ 変更ここまで ▲
     
-    def generate_rss_feed(self, articles: List) -> str:
-        # (この関数は変更なし)
-        articles = sorted(articles, key=lambda x: datetime.fromisoformat(x['published_date']), reverse=True)
-        rss = Element('rss', version='2.0', attrib={'xmlns:atom': 'http://www.w3.org/2005/Atom'})
-        channel = SubElement(rss, 'channel')
-        SubElement(channel, 'title').text = self.channel_info['title']
-        SubElement(channel, 'link').text = self.channel_info['link']
-        SubElement(channel, 'description').text = self.channel_info['description']
-        SubElement(channel, 'language').text = self.channel_info['language']
+    def channel_elements(self, feed_path: str = COMBINED_FEED_PATH, title: Optional[str] = None) -> List[Element]:
+        """channel直下に置く item 以外の要素"""
         jst = timezone(timedelta(hours=+9))
-        SubElement(channel, 'lastBuildDate').text = datetime.now(jst).strftime('%a, %d %b %Y %H:%M:%S %z')
-        SubElement(channel, 'generator').text = self.channel_info['generator']
-        atom_link = SubElement(channel, 'atom:link')
-        atom_link.set('href', f"{self.channel_info['link']}rss/combined.xml")
+        elements = []
+        for tag, text in [
+            ('title', title or self.channel_info['title']),
+            ('link', self.channel_info['link']),
+            ('description', self.channel_info['description']),
+            ('language', self.channel_info['language']),
+            ('lastBuildDate', datetime.now(jst).strftime('%a, %d %b %Y %H:%M:%S %z')),
+            ('generator', self.channel_info['generator']),
+        ]:
+            elem = Element(tag)
+            elem.text = text
+            elements.append(elem)
+        atom_link = Element('atom:link')
+        atom_link.set('href', f"{self.channel_info['link']}{feed_path}")
         atom_link.set('rel', 'self')
         atom_link.set('type', 'application/rss+xml')
-        for article in articles:
-            item = self.create_rss_item(article)
-            channel.append(item)
-        rough_string = tostring(rss, 'utf-8')
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ", encoding="utf-8").decode()
-    
-    def save_rss_file(self, rss_content: str, filepath: str):
-        # (この関数は変更なし)
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(rss_content)
-        logger.info(f"RSSファイルを保存しました: {filepath}")
-    
-    def generate_metadata(self, articles: List) -> Dict:
-        # (この関数は変更なし)
+        elements.append(atom_link)
+        return elements
+
+    def write_channel(self, items: Iterable[Element], out: TextIO, feed_path: str = COMBINED_FEED_PATH,
+                      title: Optional[str] = None, max_bytes: Optional[int] = None) -> int:
+        """item 要素を1件ずつ受け取り、RSSとして出力先へ書き出す
+
+        max_bytes を指定すると、全体がそのバイト数（UTF-8）に収まるところで item を打ち切る。
+        ただし最新の1件は必ず載せる。戻り値は書き出した item の件数。
+        """
+        indent, newl = ("", "") if self.compact else ("  ", "\n")
+        head, tail = io.StringIO(), io.StringIO()
+        writer = RSSStreamWriter(head, indent, newl)
+        writer.write_declaration()
+        rss_attrib = {'xmlns:atom': 'http://www.w3.org/2005/Atom', 'version': '2.0'}
+        writer.start('rss', rss_attrib, 0)
+        writer.start('channel', {}, 1)
+        for elem in self.channel_elements(feed_path, title):
+            writer.write_element(elem, 2)
+        writer = RSSStreamWriter(tail, indent, newl)
+        writer.end('channel', 1)
+        writer.end('rss', 0)
+
+        out.write(head.getvalue())
+        used = len(head.getvalue().encode('utf-8')) + len(tail.getvalue().encode('utf-8'))
+        count = 0
+        item_writer = RSSStreamWriter(out, indent, newl)
+        for item in items:
+            if max_bytes is not None:
+                buffer = io.StringIO()
+                RSSStreamWriter(buffer, indent, newl).write_element(item, 2)
+                text = buffer.getvalue()
+                size = len(text.encode('utf-8'))
+                if count and used + size > max_bytes:
+                    break
+                out.write(text)
+                used += size
+            else:
+                item_writer.write_element(item, 2)
+            count += 1
+        out.write(tail.getvalue())
+        return count
+
+    def write_rss_feed(self, articles: Iterable, out: TextIO):
+        """統合RSSを出力先へ書き出す。item は1件ずつ生成してすぐに書き出す"""
+        dated = sorted(((_published_datetime(article), article) for article in articles), key=lambda pair: pair[0], reverse=True)
+        self.write_channel((self.create_rss_item(article, published) for published, article in dated), out)
+
+    def build_feeds(self, articles: Iterable, limit: int = FEED_MAX_ITEMS, summary: Optional[Dict] = None) -> Dict[str, Dict]:
+        """統合・サイト別・カテゴリ別のフィードへ記事を振り分ける
+
+        記事は1件ずつ受け取り、日付の解析と分類は記事ごとに一度だけ行う。各フィードには
+        新しい順に limit 件だけをヒープで残すため、記事の総数に関わらず保持するのは
+        フィード数×limit 件まで。item は残った記事にだけ生成し、所属する全フィードで共有する。
+        summary に辞書を渡すと、同じ走査で記事数・カテゴリ・サイト名を集計して書き込む。
+        戻り値はフィードのパスをキーに {'title': ..., 'items': [...]} を持つ辞書。
+        """
+        heaps: Dict[str, List] = {COMBINED_FEED_PATH: []}
+        titles = {COMBINED_FEED_PATH: self.channel_info['title']}
+        # 対応サイトのフィードは記事が無くても作る（index.html からリンクしているため）
+        for source, site_key in SOURCE_KEYS.items():
+            heaps[f"rss/{site_key}.xml"] = []
+            titles[f"rss/{site_key}.xml"] = f"{source} - 法律ニュースRSS"
+        total, categories, sources = 0, set(), set()
+        for seq, article in enumerate(articles):
+            published = _published_datetime(article)
+            category = self.categorize_article(article['title'], article['content'])
+            total += 1
+            categories.add(category)
+            sources.add(article['source'])
+
+            targets = [COMBINED_FEED_PATH]
+            site_key = article.get('site_key') or SOURCE_KEYS.get(article.get('source'))
+            if site_key:
+                feed_path = f"rss/{site_key}.xml"
+                titles.setdefault(feed_path, f"{article['source']} - 法律ニュースRSS")
+                targets.append(feed_path)
+            slug = self.classifier.slug(category)
+            if slug:
+                feed_path = f"rss/category/{slug}.xml"
+                titles.setdefault(feed_path, f"{category} - 法律ニュースRSS")
+                targets.append(feed_path)
+
+            # 公開日時が同じ記事は先に現れたものを新しいとみなす（安定ソートと同じ順序）
+            entry = (published.timestamp(), -seq, (article, published, category))
+            for feed_path in targets:
+                heap = heaps.setdefault(feed_path, [])
+                if len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+
+        if summary is not None:
+            summary.update(total_articles=total, categories=sorted(categories), sources=sorted(sources))
+        items = {}
+        def item_for(entry) -> Element:
+            seq = entry[1]
+            if seq not in items:
+                items[seq] = self.create_rss_item(*entry[2])
+            return items[seq]
+        return {
+            feed_path: {'title': titles[feed_path],
+                        'items': [item_for(entry) for entry in sorted(heap, key=lambda e: e[:2], reverse=True)]}
+            for feed_path, heap in heaps.items()
+        }
+
+    def build_feeds_from_store(self, store: ArticleStore, limit: int = FEED_MAX_ITEMS) -> Dict[str, Dict]:
+        """記事ストアからフィードごとに最新 limit 件だけを取り出して振り分ける
+
+        複数のフィードに載る記事も item は一度だけ生成して共有する。
+        """
+        items = {}
+        def item_for(article: Dict) -> Element:
+            if article['url'] not in items:
+                # カテゴリ別フィードの振り分けと同じく、保存済みのカテゴリを使う
+                items[article['url']] = self.create_rss_item(article, _published_datetime(article), article['category'])
+            return items[article['url']]
+
+        feeds = {COMBINED_FEED_PATH: {
+            'title': self.channel_info['title'],
+            'items': [item_for(article) for article in store.iter_newest(limit)],
+        }}
+        # 対応サイトのフィードは記事が無くても作る（index.html からリンクしているため）
+        site_keys = dict(store.site_keys())
+        for source, site_key in SOURCE_KEYS.items():
+            site_keys.setdefault(site_key, source)
+        for site_key, source in sorted(site_keys.items()):
+            feeds[f"rss/{site_key}.xml"] = {
+                'title': f"{source} - 法律ニュースRSS",
+                'items': [item_for(article) for article in store.iter_newest(limit, site_key=site_key)],
+            }
+        for category in store.categories():
+            slug = self.classifier.slug(category)
+            if not slug:
+                # カテゴリ定義から外れたカテゴリ
+                continue
+            feeds[f"rss/category/{slug}.xml"] = {
+                'title': f"{category} - 法律ニュースRSS",
+                'items': [item_for(article) for article in store.iter_newest(limit, category=category)],
+            }
+        return feeds
+
+    def write_feed_file(self, feed_path: str, feed: Dict):
+        """フィードを組み立て、.gz・.br とともに置き換える（書きかけのファイルは公開しない）"""
+        buffer = io.StringIO()
+        with stats.span('rss.write_feed'):
+            count = self.write_channel(feed['items'], buffer, feed_path, feed['title'], self.max_bytes)
+            publish_file(feed_path, buffer.getvalue().encode('utf-8'))
+        if count < len(feed['items']):
+            logger.info(f"RSSファイルを保存しました: {feed_path} ({count}件、容量上限のため{len(feed['items'])}件から削減)")
+        else:
+            logger.info(f"RSSファイルを保存しました: {feed_path} ({count}件)")
+
+    def write_feeds(self, feeds: Dict[str, Dict], max_workers: int = 4):
+        """各フィードを並行して書き出す"""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda entry: self.write_feed_file(*entry), feeds.items()))
+        self.remove_stale_feeds(feeds)
+
+    def remove_stale_feeds(self, feeds: Dict[str, Dict]):
+        """今回生成しなかったフィード（廃止したサイトや記事の無くなったカテゴリ）を圧縮版ごと削除する"""
+        feed_dir = os.path.dirname(COMBINED_FEED_PATH)
+        existing = glob.glob(os.path.join(feed_dir, '*.xml')) + glob.glob(os.path.join(feed_dir, 'category', '*.xml'))
+        for feed_path in existing:
+            if feed_path in feeds:
+                continue
+            for path in (feed_path, f"{feed_path}.gz", f"{feed_path}.br"):
+                if os.path.exists(path):
+                    os.remove(path)
+            logger.info(f"古いRSSファイルを削除しました: {feed_path}")
+
+    def generate_rss_feed(self, articles: List) -> str:
+        """全記事を1つのRSS文字列にする（tests/ で改修前の出力と比較する）"""
+        buffer = io.StringIO()
+        self.write_rss_feed(articles, buffer)
+        return buffer.getvalue()
+
+    def feeds_fingerprint(self, feeds: Dict[str, Dict], summary: Optional[Dict] = None) -> str:
+        """各フィードのパスと item の内容（と集計値）から、生成内容の指紋を計算する
+
+        guid は記事の登録時に固定されるため、タイトル・本文・日付・カテゴリの修正も
+        検出できるよう item 全体を直列化して指紋に含める。
+        """
+        digest = hashlib.sha1()
+        # 出力形式を変えたときは記事が同じでも書き出し直す
+        digest.update(f"compact={self.compact};max_bytes={self.max_bytes}\n".encode('utf-8'))
+        # フィードに載らない古い記事が増えた場合もメタデータの記事数を更新する
+        if summary is not None:
+            digest.update(json.dumps(summary, ensure_ascii=False, sort_keys=True).encode('utf-8') + b'\n')
+        # 複数のフィードで共有している item は一度だけ直列化する
+        serialized: Dict[int, bytes] = {}
+        for feed_path in sorted(feeds):
+            digest.update(feed_path.encode('utf-8'))
+            for item in feeds[feed_path]['items']:
+                if id(item) not in serialized:
+                    serialized[id(item)] = tostring(item, encoding='unicode').encode('utf-8')
+                digest.update(b'\0' + serialized[id(item)])
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    def is_unchanged(self, fingerprint: str, feeds: Dict[str, Dict], metadata_path: str) -> bool:
+        """前回生成時の指紋と一致し、フィードファイルも揃っていれば True"""
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get('fingerprint')
+        except (OSError, ValueError):
+            return False
+        return previous == fingerprint and all(
+            os.path.exists(feed_path) and os.path.exists(f"{feed_path}.gz") for feed_path in feeds)
+
+    def generate_metadata(self, summary: Dict, fingerprint: Optional[str] = None) -> Dict:
+        """集計済みの summary（記事数・カテゴリ・サイト名）にメタデータを付け加える"""
         return {
             'last_updated': datetime.now().isoformat(),
-            'total_articles': len(articles),
-            'categories': list(set(self.categorize_article(article['title'], article['content']) for article in articles))
+            **summary,
+            'fingerprint': fingerprint
         }
     
+    def generate(self, store: Optional[ArticleStore] = None, articles: Optional[Iterable] = None,
+                 metadata_path: str = 'metadata.json') -> bool:
+        """記事ストア、または記事の反復可能オブジェクトから全フィードとメタデータを生成する
+
+        articles は一度だけ走査するため、ファイルから1件ずつ読み込むジェネレータでもよい。
+        前回から記事が変わっていなければ何も書かずに False を返す。
+        """
+        with stats.span('rss.build_feeds', root=True):
+            if store is not None:
+                # メタデータはフィードに載る最新分ではなく、アーカイブ全体から集計する
+                summary = {
+                    'total_articles': store.count(),
+                    'categories': store.categories(),
+                    'sources': sorted(source for _, source in store.site_keys()),
+                }
+                logger.info(f"記事ストアから読み込みます ({summary['total_articles']}件)")
+                feeds = self.build_feeds_from_store(store)
+            else:
+                summary = {}
+                feeds = self.build_feeds(articles, summary=summary)
+                logger.info(f"{summary['total_articles']}件の記事からフィードを組み立てました")
+
+        fingerprint = self.feeds_fingerprint(feeds, summary)
+        # RSS_FORCE_REBUILD=1 のときは指紋が同じでも書き出す
+        if os.environ.get('RSS_FORCE_REBUILD') != '1' and self.is_unchanged(fingerprint, feeds, metadata_path):
+            logger.info("記事に変更がないため、フィードの再生成をスキップしました")
+            return False
+        self.write_feeds(feeds)
+        with stats.span('rss.metadata', root=True):
+            metadata = self.generate_metadata(summary, fingerprint)
+            self.save_metadata(metadata, metadata_path)
+        logger.info("RSS生成完了")
+        return True
+
     def save_metadata(self, metadata: Dict, filepath: str):
-        # (この関数は変更なし)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        data = json.dumps(metadata, ensure_ascii=False, indent=None if self.compact else 2)
+        publish_file(filepath, data.encode('utf-8'))
         logger.info(f"メタデータを保存しました: {filepath}")
 
-def main():
-    # (この関数は変更なし)
+def write_github_output(name: str, value: str):
+    """GitHub Actions 上ではステップの出力として値を渡す"""
+    output_path = os.environ.get('GITHUB_OUTPUT')
+    if output_path:
+        with open(output_path, 'a', encoding='utf-8') as f:
+            f.write(f"{name}={value}\n")
+
+def main() -> bool:
+    """フィードを生成する。前回から記事が変わっていなければ何も書かずに False を返す"""
     generator = StaticRSSGenerator()
-    if not os.path.exists('articles.json'):
-        logger.error("articles.jsonが見つかりません。先にscraper.pyを実行してください。")
-        return
-    with open('articles.json', 'r', encoding='utf-8') as f:
-        articles = json.load(f)
-    logger.info(f"{len(articles)}件の記事を読み込みました")
-    combined_rss = generator.generate_rss_feed(articles)
-    generator.save_rss_file(combined_rss, 'rss/combined.xml')
-    metadata = generator.generate_metadata(articles)
-    generator.save_metadata(metadata, 'metadata.json')
-    logger.info("RSS生成完了")
+    if os.path.exists(STORE_PATH):
+        with ArticleStore(STORE_PATH, generator.classifier) as store:
+            return generator.generate(store=store)
+    if os.path.exists('articles.json'):
+        # 記事は1件ずつ読み込み、フィードごとに最新の記事だけを保持する
+        return generator.generate(articles=iter_articles_json('articles.json'))
+    logger.error("記事ストアも articles.json も見つかりません。先にscraper.pyを実行してください。")
+    return False
 
 if __name__ == "__main__":
-    main()
+    changed = main()
+    write_github_output('feeds_changed', 'true' if changed else 'false')
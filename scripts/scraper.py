@@ -1,52 +1,63 @@
-import time
-import json
 import logging
+import multiprocessing
 import os
 import re
+from collections import deque
+from multiprocessing.connection import wait
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
 from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
 
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+
+from fetchers import FetchedPage, HttpFetcher, BrowserFetcher, HostRateLimiter, wait_until
+from http_cache import ResponseCache
+from article_store import ArticleStore
+from dedup import deduplicate
+from instrumentation import stats, profiled
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 JST = timezone(timedelta(hours=9))
 
-def setup_driver():
-    options = Options()
-    options.page_load_strategy = 'eager'
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36")
-    prefs = {"profile.managed_default_content_settings.images": 2}
-    options.add_experimental_option("prefs", prefs)
-    chrome_binary_location = os.environ.get('CHROME_BINARY_LOCATION')
-    if chrome_binary_location:
-        options.binary_location = chrome_binary_location
-        logger.info(f"Chrome binary location set to: {chrome_binary_location}")
-    service = ChromeService(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': "Object.defineProperty(navigator, 'webdriver', { get: () => undefined })"})
-    return driver
+# 互換用に書き出す articles.json の上限（件数・経過日数）。記事ストアには全件を保持する
+MAX_ARTICLES = 200
+MAX_ARTICLE_AGE_DAYS = 90
+
+# 記事詳細を並行取得するスレッド数（サイトごとの負荷は site_configs の rate_limit で制御）
+DETAIL_WORKERS = int(os.environ.get('SCRAPER_MAX_WORKERS', '4'))
+
+# スクレイピングを分担するワーカープロセス数（1以下ならプロセスを分けない）と、
+# 1プロセスあたりに起動してよいChromeの数
+SCRAPER_PROCESSES = int(os.environ.get('SCRAPER_PROCESSES', '2'))
+BROWSERS_PER_WORKER = int(os.environ.get('SCRAPER_BROWSERS_PER_WORKER', '1'))
+
+# 記事本文から抜き出す抜粋の長さ
+EXCERPT_LENGTH = 500
+
+# この要素の中にあるタイトル・本文・日付は記事の一部とみなさない
+EXCLUDED_TAGS = ['script', 'style', 'aside', 'footer', 'form', 'header']
+
+# ブラウザ使用時の待機上限（秒）。site_configs の 'timeouts' でサイトごとに上書きできる
+DEFAULT_TIMEOUTS = {
+    'element': 20,    # 待機対象の要素が現れるまで
+    'pagination': 10, # 「次のページ」ボタンがクリック可能になるまで
+    'page_change': 15 # クリック後に一覧の記事リンクが入れ替わるまで
+}
 
 class RobustScraper:
-    def __init__(self, driver):
-        self.driver = driver
+    def __init__(self, driver=None, max_workers: int = DETAIL_WORKERS, cache: Optional[ResponseCache] = None,
+                 max_drivers: int = BROWSERS_PER_WORKER):
+        # 基本はHTTPで取得し、JSが必要なサイトや取得結果が不完全な場合のみChromeを使う
+        self.max_workers = max_workers
+        self.cache = cache
+        self.http = HttpFetcher(pool_size=max(10, max_workers), cache=cache)
+        self.browser = BrowserFetcher(driver, max_drivers=max_drivers)
+        self.rate_limiter = HostRateLimiter()
         self.site_configs = {
             'corporate_legal': {
                 'name': '企業法務ナビ',
@@ -58,7 +69,10 @@ class RobustScraper:
                     'content': 'div.l-cont1',
                     'date': 'time[datetime], .publish-date, h1.title-articles .text-s'
                 },
-                'pagination_selector': 'a.next.page-numbers' # 次のページへのリンク
+                'pagination_selector': 'a.next.page-numbers', # 次のページへのリンク
+                'requires_js': False, # サーバー側で描画済みのためHTTP取得で足りる
+                'rate_limit': {'requests_per_second': 1.0, 'max_in_flight': 2}, # サイトへの配慮
+                'timeouts': {'element': 20, 'pagination': 10, 'page_change': 15}
             },
             'ben54': {
                 'name': '弁護士JPニュース',
@@ -71,77 +85,167 @@ class RobustScraper:
                     'date': 'time[datetime]',
                 },
                 'wait_selector': 'ul.c-list',
-                'pagination_selector': 'li.p-btn__next a' # 次のページへのリンク
+                'pagination_selector': 'li.p-btn__next a', # 次のページへのリンク
+                'requires_js': False,
+                'rate_limit': {'requests_per_second': 1.0, 'max_in_flight': 2},
+                'timeouts': {'element': 20, 'pagination': 10, 'page_change': 15}
             }
         }
+        self.configure_rate_limits()
+
+    def configure_rate_limits(self, share: int = 1):
+        """site_configs の rate_limit をホスト単位の制限として登録する
+
+        share 個のプロセスが同じサイトを同時に取得する場合は、各プロセスの上限を
+        1/share に下げてサイト全体への負荷を変えないようにする。
+        """
+        for config in self.site_configs.values():
+            budget = {'requests_per_second': 1.0, 'max_in_flight': 2, **config.get('rate_limit', {})}
+            self.rate_limiter.configure(config['list_url'],
+                                        requests_per_second=budget['requests_per_second'] / share,
+                                        max_in_flight=max(1, budget['max_in_flight'] // share))
 
-    def wait_for_page_load(self, timeout: int = 15):
+    def close(self):
+        self.http.close()
+        self.browser.close()
+
+    def timeouts(self, config: Dict) -> Dict:
+        return {**DEFAULT_TIMEOUTS, **config.get('timeouts', {})}
+
+    def fetch_page(self, url: str, config: Dict, ready_selectors: List[str]) -> Optional[FetchedPage]:
+        """ページを取得する
+
+        HTTPの結果に ready_selectors 先頭の要素が無ければChromeで取り直す。
+        HTTP取得自体に失敗した場合（404 など）はChromeでも取れないため None を返す。
+        Chromeでは ready_selectors の要素がすべて現れるまで待つ。
+        キャッシュから返した本文は保存時に確認済みのため、HTMLを解析せずにそのまま返す。
+        """
+        if not config.get('requires_js'):
+            with self.rate_limiter.limit(url):
+                page = self.http.fetch(url)
+            if page is None:
+                return None
+            if page.from_cache or page.select_one(ready_selectors[0]) is not None:
+                return page
+            if self.cache:
+                self.cache.invalidate(url)
+            logger.info(f"  -> HTTP取得結果に必要な要素が無いため、ブラウザで再取得します: {url}")
+
+        with self.rate_limiter.limit(url):
+            return self.browser.fetch(url, ready_selectors, self.timeouts(config)['element'])
+
+    def click_next_page(self, page: FetchedPage, config: Dict) -> Optional[FetchedPage]:
+        """hrefを持たないページ送りボタンをブラウザ上でクリックし、一覧が入れ替わるまで待つ"""
+        timeouts = self.timeouts(config)
+        links_selector = config['selectors']['links']
         try:
-            WebDriverWait(self.driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
-            time.sleep(2) # 動的コンテンツの描画を待つ
-        except TimeoutException:
-            logger.warning("ページの完全読み込みがタイムアウトしましたが、処理を続行します")
+            with self.browser.acquire(page.browser_slot) as slot, self.rate_limiter.limit(page.url):
+                driver = slot.driver
+                # 同じドライバが別の記事の取得に使われていた場合は一覧ページを開き直す
+                if driver.current_url != page.url:
+                    driver.get(page.url)
+                    wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, links_selector)),
+                               timeouts['element'], links_selector)
+                previous_links = driver.find_elements(By.CSS_SELECTOR, links_selector)
+                previous_first = previous_links[0] if previous_links else None
+                previous_href = previous_first.get_attribute('href') if previous_first else None
+
+                next_button = wait_until(driver, EC.element_to_be_clickable((By.CSS_SELECTOR, config['pagination_selector'])),
+                                         timeouts['pagination'], "次のページボタン")
+                # JavaScriptでクリックすることで、広告などに隠れているボタンもクリックできる
+                driver.execute_script("arguments[0].click();", next_button)
+
+                # 直前の先頭リンクが破棄されるか別の記事に変わったら、次のページに切り替わったとみなす
+                def links_changed(driver):
+                    try:
+                        return previous_first.get_attribute('href') != previous_href
+                    except StaleElementReferenceException:
+                        return True
+                if previous_first is not None:
+                    wait_until(driver, links_changed, timeouts['page_change'], "一覧の切り替え")
+                wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, links_selector)),
+                           timeouts['element'], links_selector)
+                return self.browser.current_page(slot)
+        except (NoSuchElementException, TimeoutException):
+            return None
 
-    # ▼ ここからが大幅な改修箇所 ▼
-    def get_all_article_links(self, max_per_site=100) -> List[Dict]:
+    def get_all_article_links(self, max_per_site=100, known_urls: Optional[Set[str]] = None,
+                              site_keys: Optional[List[str]] = None) -> List[Dict]:
+        """未取得の記事リンクを収集する（known_urls に含まれるURLは除外、site_keys で対象サイトを絞る）"""
+        known_urls = known_urls or set()
         all_links_info = []
         for site_key, config in self.site_configs.items():
+            if site_keys is not None and site_key not in site_keys:
+                continue
             logger.info(f"サイト「{config['name']}」の記事リンクを取得します (最大{max_per_site}件)。")
             site_links = []
             seen_urls = set()
             
+            listing_ready = [config.get('wait_selector') or config['selectors']['links']]
             try:
-                self.driver.get(config['list_url'])
-                self.wait_for_page_load()
+                with stats.span('listing_page', root=True):
+                    page = self.fetch_page(config['list_url'], config, listing_ready)
+                if page is None:
+                    raise RuntimeError(f"一覧ページを取得できませんでした: {config['list_url']}")
                 
                 page_count = 1
                 while len(site_links) < max_per_site:
                     logger.info(f"  -> {page_count}ページ目をスクレイピング中...")
                     
-                    if config.get('wait_selector'):
-                        WebDriverWait(self.driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, config['wait_selector'])))
-                    
-                    soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                    link_candidates = soup.select(config['selectors']['links'])
+                    link_candidates = page.select(config['selectors']['links'])
                     
                     found_new_link = False
+                    found_unknown_link = False
                     for link_elem in link_candidates:
                         if len(site_links) >= max_per_site: break
                         
                         href = link_elem.get('href')
                         if not href: continue
                         
-                        full_url = urljoin(self.driver.current_url, href.strip())
+                        full_url = urljoin(page.url, href.strip())
                         
                         if config.get('link_pattern') and not re.search(config['link_pattern'], full_url):
                             continue
                         
-                        if full_url not in seen_urls:
-                            site_links.append({'url': full_url, 'site_key': site_key})
-                            seen_urls.add(full_url)
-                            found_new_link = True
+                        if full_url in seen_urls:
+                            continue
+                        seen_urls.add(full_url)
+                        found_new_link = True
+                        if full_url in known_urls:
+                            continue
+                        site_links.append({'url': full_url, 'site_key': site_key})
+                        found_unknown_link = True
                     
                     # 現在のページで目標数に達したか、新しいリンクが一つも見つからなかったら終了
                     if len(site_links) >= max_per_site or not found_new_link:
                         break
 
+                    # ページ内が既知の記事だけなら、それ以降のページも取得済みとみなして終了
+                    if known_urls and not found_unknown_link:
+                        logger.info("  -> このページの記事はすべて取得済みのため、ページ送りを終了します。")
+                        break
+
                     # 次のページへのナビゲーション
                     pagination_selector = config.get('pagination_selector')
                     if not pagination_selector:
                         logger.info("  -> ページネーション設定がないため、1ページで終了します。")
                         break
                         
-                    try:
-                        next_button = WebDriverWait(self.driver, 10).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, pagination_selector))
-                        )
-                        # JavaScriptでクリックすることで、広告などに隠れているボタンもクリックできる
-                        self.driver.execute_script("arguments[0].click();", next_button)
-                        page_count += 1
-                        self.wait_for_page_load() # 次のページの読み込みを待つ
-                    except (NoSuchElementException, TimeoutException):
+                    # 次ページのURLが取れればそのまま辿り、取れない場合のみブラウザ上でクリックする
+                    next_elem = page.select_one(pagination_selector)
+                    next_href = (next_elem.get('href') or '').strip() if next_elem is not None else ''
+                    with stats.span('listing_page', root=True):
+                        if next_href and not next_href.startswith('javascript:'):
+                            next_page = self.fetch_page(urljoin(page.url, next_href), config, listing_ready)
+                        elif next_elem is not None and page.backend == BrowserFetcher.backend:
+                            next_page = self.click_next_page(page, config)
+                        else:
+                            next_page = None
+                    if next_page is None:
                         logger.info("  -> 「次のページ」ボタンが見つかりませんでした。最後のページに到達したと判断します。")
                         break
+                    page = next_page
+                    page_count += 1
 
                 all_links_info.extend(site_links)
                 logger.info(f"  => 合計 {len(site_links)} 件のリンクを取得しました。")
@@ -150,94 +254,303 @@ class RobustScraper:
                 logger.error(f"「{config['name']}」のリンク取得中にエラー: {e}", exc_info=True)
                 
         return all_links_info
-    # ▲ ここまでが大幅な改修箇所 ▲
     
-    # ... 他の関数 (clean_text, get_article_detail, etc.) は変更なし ...
     def clean_text(self, text: str) -> str:
         if not text: return ""
         return re.sub(r'\s+', ' ', text).strip()
 
+    def _is_excluded(self, elem) -> bool:
+        """ヘッダー・フッター・関連記事などの中にある要素なら True"""
+        for node in [elem, *elem.iterancestors()]:
+            if node.tag in EXCLUDED_TAGS or 'related' in (node.get('class') or '').split():
+                return True
+        return False
+
+    def _select_first(self, page: FetchedPage, selector: str):
+        for elem in page.select(selector):
+            if not self._is_excluded(elem):
+                return elem
+        return None
+
+    def _text(self, elem) -> str:
+        """要素の文字列を返す。script/style などが含まれる場合はそれらを除く"""
+        if next(elem.iterdescendants(*EXCLUDED_TAGS), None) is None:
+            return self.clean_text(elem.text_content())
+        parts = []
+        def walk(node):
+            if node.text and isinstance(node.tag, str):
+                parts.append(node.text)
+            for child in node:
+                if isinstance(child.tag, str) and child.tag not in EXCLUDED_TAGS:
+                    walk(child)
+                if child.tail:
+                    parts.append(child.tail)
+        walk(elem)
+        return self.clean_text(''.join(parts))
+
+    def parse_article(self, page: FetchedPage, url: str, site_key: str) -> Dict:
+        """記事ページから必要な要素だけを取り出す
+
+        不要な要素を木から取り除く代わりに、見つかった要素がヘッダーや関連記事の中に
+        ないかを祖先をたどって確かめる。本文は抜粋の500文字が埋まった時点で打ち切る。
+        """
+        config = self.site_configs[site_key]
+
+        title_elem = self._select_first(page, config['selectors']['title'])
+        title = self._text(title_elem) if title_elem is not None else "タイトル不明"
+
+        content = "内容を取得できませんでした。"
+        content_elem = self._select_first(page, config['selectors']['content'])
+        if content_elem is not None:
+            text_parts, length = [], 0
+            for paragraph in content_elem.iterdescendants('p'):
+                if self._is_excluded(paragraph):
+                    continue
+                text = self._text(paragraph)
+                if len(text) > 20:
+                    text_parts.append(text)
+                    length += len(text) + 1
+                    if length > EXCERPT_LENGTH:
+                        break
+            if text_parts: content = ' '.join(text_parts)[:EXCERPT_LENGTH] + '...'
+        
+        published_date = None
+        date_elem = self._select_first(page, config['selectors']['date'])
+        if date_elem is not None:
+            dt_str = date_elem.get('datetime', self._text(date_elem))
+            try: published_date = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+            except ValueError:
+                match = re.search(r'(\d{4})[/\.年]\s*(\d{1,2})[/\.月]\s*(\d{1,2})', dt_str)
+                if match: published_date = datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        
+        if not isinstance(published_date, datetime): published_date = datetime.now(JST)
+        published_date = published_date.astimezone(JST) if published_date.tzinfo else published_date.replace(tzinfo=JST)
+        
+        return {'title': title, 'url': url, 'content': content, 'published_date': published_date, 'source': config['name'], 'site_key': site_key}
+
     def get_article_detail(self, url: str, site_key: str) -> Optional[Dict]:
+        # 所要時間は article_detail.network / .wait / .rate_limit / .parse に分けて記録する
+        with stats.span('article_detail', root=True):
+            return self._get_article_detail(url, site_key)
+
+    def _get_article_detail(self, url: str, site_key: str) -> Optional[Dict]:
         config = self.site_configs[site_key]
         logger.info(f"記事詳細を取得中: {url}")
-        time.sleep(1) # サイトへの配慮
 
         try:
-            self.driver.get(url)
-            WebDriverWait(self.driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, config['selectors']['title'])))
-            time.sleep(1)
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-
-            for unwanted_selector in ['script', 'style', 'aside', 'footer', 'form', ".related", "header"]:
-                for element in soup.select(unwanted_selector):
-                    element.decompose()
-            
-            title_elem = soup.select_one(config['selectors']['title'])
-            title = self.clean_text(title_elem.get_text()) if title_elem else "タイトル不明"
-
-            content = "内容を取得できませんでした。"
-            content_elem = soup.select_one(config['selectors']['content'])
-            if content_elem:
-                text_parts = [self.clean_text(p.get_text()) for p in content_elem.find_all('p') if len(self.clean_text(p.get_text())) > 20]
-                if text_parts: content = ' '.join(text_parts)[:500] + '...'
-            
-            published_date = None
-            date_elem = soup.select_one(config['selectors']['date'])
-            if date_elem:
-                dt_str = date_elem.get('datetime', self.clean_text(date_elem.get_text()))
-                try: published_date = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
-                except ValueError:
-                    match = re.search(r'(\d{4})[/\.年]\s*(\d{1,2})[/\.月]\s*(\d{1,2})', dt_str)
-                    if match: published_date = datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
-            
-            if not isinstance(published_date, datetime): published_date = datetime.now(JST)
-            published_date = published_date.astimezone(JST) if published_date.tzinfo else published_date.replace(tzinfo=JST)
-            
-            result = {'title': title, 'url': url, 'content': content, 'published_date': published_date, 'source': config['name']}
+            page = self.fetch_page(url, config, [config['selectors']['title'], config['selectors']['content']])
+            if page is None:
+                raise RuntimeError("ページを取得できませんでした")
+
+            # 前回と同じ本文であれば、保存済みの抽出結果を使いHTML解析を省略する
+            if page.from_cache and page.body_hash:
+                record = self.cache.load_parsed(page.body_hash, site_key)
+                if record:
+                    record.update(url=url, published_date=datetime.fromisoformat(record['published_date']))
+                    logger.info(f"  ✓ キャッシュから取得: {record['title'][:50]}...")
+                    stats.count('articles.parsed_from_cache')
+                    return record
+            with stats.span('parse'):
+                result = self.parse_article(page, url, site_key)
+            stats.count('articles.parsed')
+            title, published_date = result['title'], result['published_date']
             
             if title == "タイトル不明": logger.warning(f"  - タイトルが取得できませんでした。")
-            else: logger.info(f"  ✓ 取得完了: {title[:50]}...")
+            else:
+                logger.info(f"  ✓ 取得完了: {title[:50]}...")
+                if self.cache and page.body_hash:
+                    self.cache.store_parsed(page.body_hash, site_key, dict(result, published_date=published_date.isoformat()))
             return result
         except Exception as e:
             logger.error(f"記事詳細の取得中にエラー ({url}): {e}")
             return None
 
-def save_articles_json(articles: List[Dict], filepath: str):
-    # ... 変更なし ...
-    articles_for_json = []
-    for article in articles:
-        new_article = article.copy()
-        if isinstance(new_article.get('published_date'), datetime):
-            new_article['published_date'] = new_article['published_date'].isoformat()
-        articles_for_json.append(new_article)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(articles_for_json, f, ensure_ascii=False, indent=2)
-    logger.info(f"記事データを保存しました: {filepath}")
+    def get_article_details(self, links_info: List[Dict]) -> List[Optional[Dict]]:
+        """記事詳細を並行取得する。結果は links_info と同じ順序で、失敗した記事は None になる"""
+        if not links_info:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda info: self.get_article_detail(info['url'], info['site_key']), links_info))
 
-def main():
-    # ... ここは変更なし、100のまま ...
-    driver = None
+def _scrape_worker(conn, max_drivers: int):
+    """ワーカープロセス本体。自前のHTTPセッションとChromeでタスクを順に処理する
+
+    タスクは (task_id, 種類, 同時に同じサイトを取得するプロセス数, 引数) として親プロセスから
+    1件ずつ受け取り、結果は (task_id, 結果, エラー内容, 計測値) として同じパイプで返す。
+    """
+    with profiled(f".worker-{os.getpid()}"):
+        _process_tasks(conn, max_drivers)
+
+def _process_tasks(conn, max_drivers: int):
+    scraper = RobustScraper(cache=ResponseCache(), max_drivers=max_drivers)
+    try:
+        for task_id, kind, share, payload in iter(conn.recv, None):
+            try:
+                scraper.configure_rate_limits(share)
+                if kind == 'links':
+                    result = scraper.get_all_article_links(payload['max_per_site'], payload['known_urls'], [payload['site_key']])
+                else:
+                    result = scraper.get_article_details(payload)
+                conn.send((task_id, result, None, stats.drain()))
+            except Exception as e:
+                # 1つのタスクの失敗で他のタスクを止めない
+                conn.send((task_id, None, repr(e), stats.drain()))
+    finally:
+        scraper.close()
+
+def _run_tasks(workers: Dict, tasks: List[Tuple]) -> Dict[int, object]:
+    """空いているワーカーにタスクを1件ずつ渡し、すべての結果が返るまで待つ
+
+    workers は {パイプ: プロセス}。ワーカーごとに専用のパイプを使うため、1つのワーカーが
+    異常終了しても他のワーカーとのやり取りは止まらない。異常終了したワーカーが処理中だった
+    タスクは失敗 (None) とし、そのワーカーは workers から取り除く。
+    """
+    waiting = deque(tasks)
+    idle = list(workers)
+    in_flight: Dict = {}
+    results = {}
+    while waiting or in_flight:
+        while waiting and idle:
+            conn = idle.pop()
+            if workers[conn].is_alive():
+                try:
+                    conn.send(waiting[0])
+                    in_flight[conn] = waiting.popleft()[0]
+                    continue
+                except OSError:
+                    pass
+            # 待機中に終了していたワーカーには渡さない
+            logger.error(f"ワーカープロセスが終了しています (終了コード {workers.pop(conn).exitcode})")
+            conn.close()
+        if not in_flight:
+            logger.error(f"動いているワーカープロセスが無いため、未完了の {len(waiting)}件のタスクを破棄します")
+            break
+        sentinels = {workers[conn].sentinel: conn for conn in in_flight}
+        for ready in wait([*in_flight, *sentinels]):
+            conn = sentinels.get(ready, ready)
+            if conn not in in_flight:
+                continue
+            try:
+                # 終了直前に送られた結果があれば先に受け取る
+                message = conn.recv() if ready is conn or conn.poll() else None
+            except (EOFError, OSError):
+                message = None
+            if message is None:
+                task_id = in_flight.pop(conn)
+                worker = workers.pop(conn)
+                worker.join(timeout=5)
+                logger.error(f"ワーカープロセスが異常終了しました (終了コード {worker.exitcode}、タスク {task_id} は失敗扱い)")
+                results[task_id] = None
+                conn.close()
+                continue
+            task_id, result, error, task_stats = message
+            del in_flight[conn]
+            idle.append(conn)
+            if error:
+                logger.error(f"ワーカープロセスでエラー (タスク {task_id}): {error}")
+            stats.merge(task_stats)
+            results[task_id] = result
+    return results
+
+def scrape_in_processes(site_keys: List[str], known_urls: Set[str], processes: int = SCRAPER_PROCESSES,
+                        max_drivers: int = BROWSERS_PER_WORKER, max_per_site: int = 100) -> List[Optional[Dict]]:
+    """サイトごとのリンク収集と、記事リンクを分割した詳細取得を複数のプロセスで行う
+
+    結果はタスクの投入順に並べ直してから URL で重複を除くため、実行ごとの順序は変わらない。
+    """
+    # 親プロセスの記事ストアの接続などを引き継がないよう、fork ではなく spawn で起動する
+    context = multiprocessing.get_context('spawn')
+    workers = {}
+    for _ in range(processes):
+        conn, child_conn = context.Pipe()
+        worker = context.Process(target=_scrape_worker, args=(child_conn, max_drivers), daemon=True)
+        worker.start()
+        child_conn.close()
+        workers[conn] = worker
+    try:
+        # 一覧ページはページ送りが順番に進むため、1サイトを1プロセスで担当する
+        link_tasks = [(i, 'links', 1, {'site_key': site_key, 'known_urls': known_urls, 'max_per_site': max_per_site})
+                      for i, site_key in enumerate(site_keys)]
+        link_results = _run_tasks(workers, link_tasks)
+        links_info, seen_urls = [], set()
+        for task_id, *_ in link_tasks:
+            for info in link_results.get(task_id) or []:
+                if info['url'] not in seen_urls:
+                    seen_urls.add(info['url'])
+                    links_info.append(info)
+        logger.info(f"取得したリンク総数: {len(links_info)} (既存 {len(known_urls)}件はスキップ)")
+
+        # 記事詳細はサイトごとにリンクを分割し、同じサイトをプロセス数だけ並行して取得する
+        detail_tasks = []
+        for site_key in site_keys:
+            site_links = [info for info in links_info if info['site_key'] == site_key]
+            shard_count = min(processes, len(site_links))
+            for shard in range(shard_count):
+                detail_tasks.append((len(link_tasks) + len(detail_tasks), 'details', shard_count, site_links[shard::shard_count]))
+        detail_results = _run_tasks(workers, detail_tasks)
+
+        articles, seen_urls = [], set()
+        for task_id, _, _, shard_links in detail_tasks:
+            for article in detail_results.get(task_id) or []:
+                if article and article['url'] not in seen_urls:
+                    seen_urls.add(article['url'])
+                    articles.append(article)
+        return articles
+    finally:
+        for conn in workers:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for conn, worker in workers.items():
+            worker.join(timeout=60)
+            if worker.is_alive():
+                worker.terminate()
+            conn.close()
+
+def scrape_new_articles(store: ArticleStore, full_refresh: bool = False, processes: int = SCRAPER_PROCESSES) -> List[Dict]:
+    """記事ストアに無い記事だけを取得して返す（published_date は datetime のまま）"""
+    if store.count() == 0:
+        store.import_json('articles.json')
+    known_urls = set() if full_refresh else store.known_urls()
+    cache = ResponseCache()
+    scraper = RobustScraper(cache=cache)
     try:
-        driver = setup_driver()
-        scraper = RobustScraper(driver)
-        links_to_scrape = scraper.get_all_article_links(max_per_site=100)
-        logger.info(f"取得したリンク総数: {len(links_to_scrape)}")
+        if processes > 1:
+            logger.info(f"{processes}個のワーカープロセスでスクレイピングします")
+            results = scrape_in_processes(list(scraper.site_configs), known_urls, processes)
+        else:
+            links_to_scrape = scraper.get_all_article_links(max_per_site=100, known_urls=known_urls)
+            logger.info(f"取得したリンク総数: {len(links_to_scrape)} (既存 {len(known_urls)}件はスキップ)")
+            results = scraper.get_article_details(links_to_scrape)
 
         all_articles = []
-        if links_to_scrape:
-            for i, link_info in enumerate(links_to_scrape, 1):
-                logger.info(f"詳細処理中: {i}/{len(links_to_scrape)}")
-                article = scraper.get_article_detail(link_info['url'], link_info['site_key'])
-                if article and article.get('content') != "内容を取得できませんでした。" and article.get('title') != "タイトル不明":
-                    all_articles.append(article)
+        for article in results:
+            if article and article.get('content') != "内容を取得できませんでした。" and article.get('title') != "タイトル不明":
+                all_articles.append(article)
         
-        logger.info(f"全サイトのスクレイピング完了: 合計 {len(all_articles)} 件の記事を取得")
-        save_articles_json(all_articles, 'articles.json')
-    except Exception as e:
-        logger.error(f"メイン処理でエラーが発生: {e}", exc_info=True)
+        logger.info(f"全サイトのスクレイピング完了: 新規 {len(all_articles)} 件の記事を取得")
+        return all_articles
     finally:
-        if driver:
-            driver.quit()
+        scraper.close()
+        cache.prune()
+
+def export_articles_json(store: ArticleStore, filepath: str = 'articles.json') -> bool:
+    """互換用の articles.json には新しい記事のみを書き出す"""
+    since = datetime.now(JST) - timedelta(days=MAX_ARTICLE_AGE_DAYS)
+    return store.export_json(filepath, limit=MAX_ARTICLES, since=since)
+
+def main():
+    # SCRAPER_FULL_REFRESH=1 のときは既存データを無視して全件取得し直す
+    full_refresh = os.environ.get('SCRAPER_FULL_REFRESH') == '1'
+    with ArticleStore() as store:
+        try:
+            articles = deduplicate(store, scrape_new_articles(store, full_refresh))
+            changed = store.upsert_articles(articles)
+            logger.info(f"記事ストアを更新しました: {changed}件 (アーカイブ合計 {store.count()}件)")
+            export_articles_json(store)
+        except Exception as e:
+            logger.error(f"メイン処理でエラーが発生: {e}", exc_info=True)
 
 if __name__ == "__main__":
     main()
@@ -1,57 +1,85 @@
 import os
 import sys
-import subprocess
+import json
+import time
 import logging
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List
+
+from article_store import ArticleStore
+from scraper import scrape_new_articles, export_articles_json
+from dedup import deduplicate
+from rss_generator import StaticRSSGenerator, write_github_output
+from instrumentation import stats, profiled
 
 # ログ設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def run_command(command: List[str], description: str) -> bool:
-    """コマンドを実行し、結果をログ出力"""
+@contextmanager
+def stage(description: str, name: str):
+    """処理段階の開始・完了と所要時間をログ出力し、run_stats.json に name として記録する"""
     logger.info(f"開始: {description}")
+    start = time.perf_counter()
     try:
-        # shell=Trueを避け、コマンドをリストで渡すことでセキュリティと安定性を向上
-        result = subprocess.run(command, check=True, capture_output=True, text=True, encoding='utf-8')
-        logger.info(f"完了: {description}")
-        if result.stdout:
-            logger.info(f"出力:\n{result.stdout}")
-        if result.stderr:
-            logger.warning(f"標準エラー出力:\n{result.stderr}")
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"エラー: {description}")
-        logger.error(f"エラー出力:\n{e.stderr}")
-        return False
+        with stats.span(f"pipeline.{name}", root=True):
+            yield
+    except Exception as e:
+        logger.error(f"エラー: {description} ({time.perf_counter() - start:.2f}秒): {e}", exc_info=True)
+        raise
+    logger.info(f"完了: {description} ({time.perf_counter() - start:.2f}秒)")
 
 def main():
-    """メイン処理"""
+    """メイン処理。RUN_PROFILE を指定すると全体を cProfile で計測する"""
+    with profiled():
+        run()
+
+def run():
     logger.info("=== 法律ニュースRSS更新開始 ===")
     start_time = datetime.now()
     
     # このスクリプトはリポジトリのルートから実行されることを想定
-    
-    # 1. スクレイピング実行
-    if not run_command([sys.executable, "scripts/scraper.py"], "ニュース記事のスクレイピング"):
-        logger.error("スクレイピングに失敗しました")
-        sys.exit(1)
-    
-    # 2. RSS生成実行
-    if not run_command([sys.executable, "scripts/rss_generator.py"], "RSSフィードの生成"):
-        logger.error("RSS生成に失敗しました")
+    # スクレイピングとRSS生成を同じプロセスで実行し、記事はPythonオブジェクトのまま受け渡す
+    full_refresh = os.environ.get('SCRAPER_FULL_REFRESH') == '1'
+    # EXPORT_ARTICLES_JSON=0 のときは互換用の articles.json を書き出さない
+    export_json = os.environ.get('EXPORT_ARTICLES_JSON', '1') == '1'
+    generator = StaticRSSGenerator()
+    try:
+        with ArticleStore(classifier=generator.classifier) as store:
+            # 1. スクレイピング実行
+            with stage("ニュース記事のスクレイピング", 'scrape'):
+                articles = scrape_new_articles(store, full_refresh)
+
+            # 2. 既存記事・同じ回の記事との重複判定（重複はフィードに載せない）
+            with stage("重複記事の判定", 'dedup'):
+                articles = deduplicate(store, articles)
+
+            # 3. 記事ストアへの保存
+            with stage("記事ストアの更新", 'store'):
+                changed = store.upsert_articles(articles)
+                logger.info(f"更新件数: {changed}件 (アーカイブ合計 {store.count()}件)")
+                if export_json:
+                    export_articles_json(store)
+
+            # 4. RSS生成実行
+            with stage("RSSフィードの生成", 'generate'):
+                feeds_changed = generator.generate(store=store)
+    except Exception:
+        logger.error("RSS更新に失敗しました")
+        write_run_stats(start_time, succeeded=False)
         sys.exit(1)
+
+    write_github_output('feeds_changed', 'true' if feeds_changed else 'false')
     
     end_time = datetime.now()
     duration = end_time - start_time
     
     logger.info(f"=== 法律ニュースRSS更新完了 ===")
     logger.info(f"実行時間: {duration.total_seconds():.2f}秒")
+    write_run_stats(start_time, succeeded=True, feeds_changed=feeds_changed)
     
     # メタデータファイルのパスをルートからの相対パスに修正
     try:
-        import json
         with open('metadata.json', 'r', encoding='utf-8') as f:
             metadata = json.load(f)
         logger.info(f"総記事数: {metadata.get('total_articles', 'N/A')}")
@@ -59,5 +87,13 @@ def main():
     except Exception as e:
         logger.warning(f"統計情報の読み込みに失敗: {e}")
 
+def write_run_stats(start_time: datetime, **extra):
+    """段階ごとの p50/p95 とカウンタを run_stats.json に書き出す"""
+    try:
+        stats.write(started_at=start_time.isoformat(),
+                    duration=round((datetime.now() - start_time).total_seconds(), 3), **extra)
+    except OSError as e:
+        logger.warning(f"計測結果の保存に失敗: {e}")
+
 if __name__ == "__main__":
     main()
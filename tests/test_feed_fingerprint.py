@@ -0,0 +1,31 @@
+"""記事の内容が修正されたときにフィードを生成し直すことを確かめる"""
+import os
+import sys
+import json
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(TESTS_DIR, 'fixtures')
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'scripts'))
+
+from article_store import ArticleStore
+from rss_generator import StaticRSSGenerator, COMBINED_FEED_PATH
+
+
+def test_edited_article_is_republished(tmp_path, monkeypatch):
+    # フィードは作業ディレクトリからの相対パスに書き出される
+    monkeypatch.chdir(tmp_path)
+    with open(os.path.join(FIXTURES_DIR, 'articles.json'), 'r', encoding='utf-8') as f:
+        articles = json.load(f)[:20]
+    generator = StaticRSSGenerator()
+    with ArticleStore(str(tmp_path / 'articles.db'), generator.classifier) as store:
+        store.upsert_articles(articles)
+        assert generator.generate(store=store)
+        assert not generator.generate(store=store)
+
+        # 同じURLの記事を見出しだけ直して取り込み直す（guid は登録時のまま）
+        edited = dict(articles[0], title=articles[0]['title'] + '（訂正）')
+        assert store.upsert_articles([edited]) == 1
+        assert generator.generate(store=store)
+
+    with open(COMBINED_FEED_PATH, 'r', encoding='utf-8') as f:
+        assert edited['title'] in f.read()
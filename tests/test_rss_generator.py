@@ -0,0 +1,36 @@
+"""RSS出力が改修前（minidom.toprettyxml）とバイト単位で一致することを確かめる
+
+fixtures/combined_baseline.xml は、改修前の rss_generator.py に fixtures/articles.json
+（同梱の articles.json の写し）を渡し、lastBuildDate を FIXED_NOW に固定して出力したもの。
+"""
+import os
+import sys
+import json
+from datetime import datetime
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(TESTS_DIR, 'fixtures')
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'scripts'))
+
+import rss_generator
+from rss_generator import StaticRSSGenerator
+
+FIXED_NOW = datetime(2026, 1, 1, 9, 0)
+
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FIXED_NOW.replace(tzinfo=tz)
+
+
+def test_generate_rss_feed_matches_baseline(monkeypatch):
+    monkeypatch.setattr(rss_generator, 'datetime', FixedDatetime)
+    with open(os.path.join(FIXTURES_DIR, 'articles.json'), 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+    with open(os.path.join(FIXTURES_DIR, 'combined_baseline.xml'), 'rb') as f:
+        expected = f.read()
+
+    generator = StaticRSSGenerator()
+    generator.compact = False
+    assert generator.generate_rss_feed(articles).encode('utf-8') == expected